@@ -0,0 +1,84 @@
+"""add transactions search indexes
+
+Revision ID: 5b8e0d3a9c61
+Revises: c4e7f19a0b25
+Create Date: 2026-10-17 13:41:55.209873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5b8e0d3a9c61'
+down_revision: Union[str, None] = 'c4e7f19a0b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# No SQLite (desenvolvimento) a busca usa uma tabela FTS5 com tokenizer trigram,
+# mantida por triggers; mesmas DDLs de app/models.py, copiadas aqui para a
+# migração não depender do código da aplicação
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, category, content='transactions', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, description, category) VALUES (new.id, new.description, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description, category)
+        VALUES ('delete', old.id, old.description, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description, category ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, description, category)
+        VALUES ('delete', old.id, old.description, old.category);
+        INSERT INTO transactions_fts(rowid, description, category) VALUES (new.id, new.description, new.category);
+    END
+    """,
+    # Indexa as transações que já existem
+    "INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS transactions_fts_au",
+    "DROP TRIGGER IF EXISTS transactions_fts_ad",
+    "DROP TRIGGER IF EXISTS transactions_fts_ai",
+    "DROP TABLE IF EXISTS transactions_fts",
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+        return
+
+    # Busca textual: full-text em português + similaridade de trigramas (ver app/search.py)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        CREATE INDEX ix_transactions_search_tsv ON transactions
+        USING gin (to_tsvector('portuguese', description || ' ' || category))
+    """)
+    op.execute("""
+        CREATE INDEX ix_transactions_search_trgm ON transactions
+        USING gin ((description || ' ' || category) gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+        return
+
+    op.drop_index('ix_transactions_search_trgm', table_name='transactions')
+    op.drop_index('ix_transactions_search_tsv', table_name='transactions')
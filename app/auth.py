@@ -1,37 +1,42 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import hashlib
+import os
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import User
+from app.cache import TTLCache
+from app.database import get_async_db
+from app.models import RefreshToken, User
+from app.passwords import hash_password, verify_and_update
+from app.revocation import RevocationFilter
 
 # Configurações
 SECRET_KEY = "sua_chave_secreta_super_segura_mude_em_producao_123456789"
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 dias
-
-# Contexto de criptografia de senha
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Access tokens curtos; a sessão é mantida pelo refresh token, rotacionado a cada uso
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", "30"))
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica se a senha corresponde ao hash"""
-    # Trunca a senha para 72 bytes (limite do bcrypt)
-    truncated_password = plain_password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.verify(truncated_password, hashed_password)
+    """Verifica se a senha corresponde ao hash (síncrono; as rotas usam app.passwords)"""
+    return verify_and_update(plain_password, hashed_password)[0]
 
 
 def get_password_hash(password: str) -> str:
-    """Gera hash da senha"""
-    # Trunca a senha para 72 bytes (limite do bcrypt)
-    truncated_password = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.hash(truncated_password)
+    """Gera hash da senha (síncrono; as rotas usam app.passwords)"""
+    return hash_password(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -47,8 +52,134 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Obtém o usuário atual a partir do token JWT"""
+# Sessões revogadas cujos access tokens ainda podem estar em circulação
+revocation_filter = RevocationFilter(
+    ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    sync_seconds=REVOCATION_SYNC_SECONDS,
+)
+# Uma única sincronização por vez: as requisições que chegam com o filtro
+# desatualizado esperam a que já está em andamento em vez de repeti-la
+_revocation_sync_lock = asyncio.Lock()
+
+
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite devolve datetimes sem fuso
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _new_refresh_token(db: Session, user_id: int, family_id: str) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def issue_tokens(db: Session, user_id: int, family_id: Optional[str] = None) -> dict:
+    """Emite access + refresh token; sem family_id abre uma nova sessão"""
+    family_id = family_id or secrets.token_hex(16)
+    refresh_token = _new_refresh_token(db, user_id, family_id)
+    db.commit()
+    access_token = create_access_token(data={"sub": str(user_id), "sid": family_id})
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def revoke_session(db: Session, family_id: str):
+    """Revoga todos os refresh tokens da sessão e os access tokens emitidos por ela"""
+    now = datetime.now(timezone.utc)
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None),
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    db.commit()
+    revocation_filter.revoke(family_id)
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[int, str]:
+    """
+    Consome o refresh token e devolve (user_id, family_id) para emitir o próximo.
+    Reapresentar um token já rotacionado indica vazamento: a sessão inteira é revogada.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    stored = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.token_hash == _hash_refresh_token(token))
+        .with_for_update()
+        .first()
+    )
+    if stored is None or stored.revoked_at is not None:
+        raise invalid
+    if stored.used_at is not None:
+        family_id = stored.family_id
+        db.rollback()
+        revoke_session(db, family_id)
+        raise invalid
+    if _as_utc(stored.expires_at) <= datetime.now(timezone.utc):
+        raise invalid
+
+    stored.used_at = datetime.now(timezone.utc)
+    return stored.user_id, stored.family_id
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuário autenticado: o mínimo que as rotas precisam, guardado em cache"""
+    id: int
+    is_active: int
+
+
+# Cache por processo do principal verificado, para não consultar `users` a cada requisição.
+# Alterações em User pelo ORM invalidam a entrada após o commit (ver listeners abaixo);
+# o TTL limita quanto tempo outro worker pode enxergar um usuário desatualizado.
+PRINCIPAL_CACHE_TTL_SECONDS = 60
+principal_cache = TTLCache(maxsize=10000, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(user_id: int):
+    """Remove o usuário do cache (desativação, alteração de dados)"""
+    principal_cache.invalidate(int(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session, flush_context):
+    changed = [obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)]
+    if changed:
+        session.info.setdefault("changed_user_ids", set()).update(changed)
+        for user_id in changed:
+            invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # Invalida de novo após o commit: uma requisição concorrente pode ter
+    # recarregado o valor antigo entre o flush e o commit
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop("changed_user_ids", None)
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> dict:
+    """Decodifica o access token e recusa sessões revogadas (sem ida ao banco no caso comum)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,25 +188,45 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        payload["sub"] = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    if revocation_filter.is_stale():
+        async with _revocation_sync_lock:
+            if revocation_filter.is_stale():
+                await db.run_sync(revocation_filter.sync)
+    if revocation_filter.is_revoked(payload.get("sid")):
         raise credentials_exception
     
-    if not user.is_active:
+    return payload
+
+
+async def get_current_user(claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """Obtém o usuário atual a partir do token JWT"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    user_id = claims["sub"]
+    
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = (await db.execute(select(User.id, User.is_active).where(User.id == user_id))).first()
+        if row is None:
+            raise credentials_exception
+        principal = Principal(id=row.id, is_active=row.is_active)
+        principal_cache.set(user_id, principal)
+    
+    if not principal.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
-    return user
+    return principal
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Verifica se o usuário está ativo"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
-
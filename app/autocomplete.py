@@ -0,0 +1,125 @@
+"""
+Autocomplete dos nomes e categorias de itens de compra, por usuário.
+
+Cada usuário tem um índice em memória com os valores já usados: chaves
+normalizadas (minúsculas, sem acentos) em uma lista ordenada, onde o prefixo
+digitado é localizado com bisect; as sugestões são ordenadas por frequência.
+
+O índice é montado na primeira consulta do usuário (duas consultas agregadas),
+atualizado nas escritas de itens deste processo e guardado em um TTLCache
+(LRU): usuários inativos saem da memória, e o TTL limita o tempo que um worker
+fica sem ver itens criados por outro. Itens novos são acrescentados ao índice;
+duplicar listas, excluir itens ou mudar o nome ou a categoria de um item só
+invalida o índice (as frequências antigas deixam de valer), que é remontado na
+próxima consulta.
+"""
+import bisect
+import heapq
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.cache import TTLCache
+from app.prices import normalize_item_name
+
+AUTOCOMPLETE_FIELDS = ("name", "category")
+AUTOCOMPLETE_CACHE_SIZE = 2048
+AUTOCOMPLETE_TTL = 30 * 60
+
+
+class PrefixIndex:
+    """Valores com frequência, em ordem de chave normalizada, para busca por prefixo"""
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._entries: Dict[str, list] = {}  # chave -> [valor exibido, frequência]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, value: str, count: int = 1):
+        key = normalize_item_name(value or "")
+        if not key:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [value.strip(), count]
+                bisect.insort(self._keys, key)
+            else:
+                entry[1] += count
+
+    def suggest(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        key = normalize_item_name(prefix)
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            # Todas as chaves com o prefixo ficam contíguas a partir de `start`
+            end = bisect.bisect_left(self._keys, key + "\uffff", lo=start)
+            matches = (self._entries[k] for k in self._keys[start:end])
+            best = heapq.nsmallest(limit, matches, key=lambda entry: (-entry[1], entry[0]))
+        return [(value, count) for value, count in best]
+
+
+class UserSuggestions:
+    def __init__(self):
+        self.indexes = {field: PrefixIndex() for field in AUTOCOMPLETE_FIELDS}
+
+    def add_item(self, name: str, category: str):
+        self.indexes["name"].add(name)
+        self.indexes["category"].add(category)
+
+
+_suggestions_cache = TTLCache(maxsize=AUTOCOMPLETE_CACHE_SIZE, ttl=AUTOCOMPLETE_TTL)
+
+
+def _build(db: Session, user_id: int) -> UserSuggestions:
+    suggestions = UserSuggestions()
+    for field in AUTOCOMPLETE_FIELDS:
+        column = getattr(models.ShoppingItem, field)
+        rows = db.execute(
+            select(column, func.count())
+            .join(models.ShoppingList, models.ShoppingList.id == models.ShoppingItem.shopping_list_id)
+            .where(models.ShoppingList.user_id == user_id)
+            .group_by(column)
+            # A grafia mais usada de cada chave normalizada entra primeiro e é a exibida
+            .order_by(func.count().desc())
+        )
+        index = suggestions.indexes[field]
+        for value, count in rows:
+            index.add(value, count)
+    return suggestions
+
+
+def get_suggestions(db: Session, user_id: int) -> UserSuggestions:
+    """Índice do usuário, montado na primeira consulta"""
+    suggestions = _suggestions_cache.get(user_id)
+    if suggestions is None:
+        suggestions = _build(db, user_id)
+        _suggestions_cache.set(user_id, suggestions)
+    return suggestions
+
+
+def suggest(db: Session, user_id: int, field: str, prefix: str, limit: int) -> List[Tuple[str, int]]:
+    return get_suggestions(db, user_id).indexes[field].suggest(prefix, limit)
+
+
+def record_items(user_id: int, items: Iterable[Tuple[str, str]]):
+    """Acrescenta (nome, categoria) gravados ao índice do usuário, se estiver em memória"""
+    # peek: uma escrita não é uso do autocomplete, não conta nas estatísticas
+    suggestions = _suggestions_cache.peek(user_id)
+    if suggestions is None:
+        return
+    for name, category in items:
+        suggestions.add_item(name, category)
+
+
+def invalidate_suggestions(user_id: int):
+    _suggestions_cache.invalidate(user_id)
+
+
+def suggestions_cache_stats() -> dict:
+    return _suggestions_cache.stats()
@@ -0,0 +1,63 @@
+"""
+Mutação de saldo das contas.
+
+Todo ajuste de Account.balance passa por aqui e vira um único
+`UPDATE accounts SET balance = balance + :delta`. O banco aplica o incremento
+sobre o valor atual da linha (com lock de linha até o commit), então duas
+requisições simultâneas nunca perdem a atualização uma da outra, como acontecia
+com o read-modify-write em Python.
+"""
+from collections import defaultdict
+from typing import Dict
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def balance_effect(type, amount: float) -> float:
+    """Efeito de uma transação no saldo da conta (receita soma, despesa subtrai)"""
+    return amount if type == "income" else -amount
+
+
+def adjust_balance(db: Session, user_id: int, account_id: int, delta: float) -> bool:
+    """
+    Soma `delta` ao saldo da conta, se ela pertencer ao usuário.
+    Retorna False quando a conta não existe (mesmo comportamento silencioso de antes).
+    """
+    if not account_id or not delta:
+        return True
+    result = db.execute(
+        update(models.Account)
+        .where(models.Account.id == account_id, models.Account.user_id == user_id)
+        .values(balance=models.Account.balance + delta)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+class BalanceDeltas:
+    """Acumula o delta líquido por conta para aplicar um UPDATE por conta"""
+
+    def __init__(self):
+        self._deltas: Dict[int, float] = defaultdict(float)
+
+    def add(self, account_id, type, amount: float, sign: int = 1):
+        if account_id:
+            self._deltas[account_id] += sign * balance_effect(type, amount)
+
+    def add_transaction(self, transaction: models.Transaction, sign: int = 1):
+        self.add(transaction.account_id, transaction.type, transaction.amount, sign)
+
+    def remove_transaction(self, transaction: models.Transaction):
+        self.add_transaction(transaction, sign=-1)
+
+    def apply(self, db: Session, user_id: int):
+        """
+        Aplica os deltas em ordem crescente de id; com a mesma ordem de lock em
+        todas as requisições, lotes concorrentes não entram em deadlock.
+        """
+        for account_id in sorted(self._deltas):
+            adjust_balance(db, user_id, account_id, self._deltas[account_id])
+        self._deltas.clear()
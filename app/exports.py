@@ -0,0 +1,89 @@
+"""
+Exportação de transações em streaming (CSV / NDJSON).
+
+A consulta roda em uma sessão própria com `yield_per`, que no PostgreSQL usa um
+cursor no servidor (stream_results). Cada lote é convertido em texto e enviado
+antes do próximo ser lido, mantendo a memória constante.
+"""
+import csv
+import enum
+import io
+import json
+from typing import Iterator
+
+from app import models
+from app.database import SessionLocal
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    models.Transaction.id,
+    models.Transaction.date,
+    models.Transaction.description,
+    models.Transaction.category,
+    models.Transaction.amount,
+    models.Transaction.type,
+    models.Transaction.account_id,
+)
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def _row_values(row) -> list:
+    """Converte uma linha em valores simples (date -> ISO, enum -> valor)"""
+    tx_id, tx_date, description, category, amount, tx_type, account_id = row
+    return [
+        tx_id,
+        tx_date.isoformat(),
+        description,
+        category,
+        amount,
+        tx_type.value if isinstance(tx_type, enum.Enum) else tx_type,
+        account_id,
+    ]
+
+
+def _csv_chunks(partitions) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in partitions:
+        writer.writerows(_row_values(row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(partitions) -> Iterator[str]:
+    for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, _row_values(row))), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+def stream_transactions(stmt, format: ExportFormat) -> Iterator[str]:
+    """Executa `stmt` com cursor no servidor e gera o arquivo em pedaços"""
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        partitions = result.partitions()
+        if format == ExportFormat.ndjson:
+            yield from _ndjson_chunks(partitions)
+        else:
+            yield from _csv_chunks(partitions)
+    finally:
+        db.close()
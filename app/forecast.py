@@ -0,0 +1,223 @@
+"""
+Detecção de transações recorrentes e projeção de saldo por conta.
+
+1. O histórico recente do usuário (HISTORY_DAYS) é agrupado por conta, tipo e
+   descrição normalizada (sem dígitos, para juntar "NETFLIX 01/25" e "NETFLIX 02/25").
+2. Em cada grupo, os intervalos entre as datas (np.diff) indicam se há uma
+   periodicidade semanal, quinzenal ou mensal estável.
+3. As ocorrências futuras de cada série viram deltas diários por conta
+   (np.add.at) e o saldo projetado é o saldo atual + soma acumulada.
+
+O passo 3 só depende das transações, então o resultado fica em cache por usuário
+até uma nova escrita de transação (invalidate_forecast) ou a virada do dia.
+O saldo atual das contas é sempre lido na hora.
+"""
+import re
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.cache import TTLCache
+from app.imports import normalize_description
+
+HISTORY_DAYS = 365
+MAX_HORIZON_DAYS = 365
+MIN_OCCURRENCES = 3
+
+# Periodicidade -> (intervalo mínimo, intervalo máximo) em dias
+PERIODS = {
+    "weekly": (6, 8),
+    "biweekly": (13, 16),
+    "monthly": (27, 33),
+}
+
+# Fração mínima dos intervalos que precisa cair dentro da faixa da periodicidade
+MIN_REGULARITY = 0.75
+# Variação máxima do valor (desvio padrão / média) para considerar a série estável
+MAX_AMOUNT_VARIATION = 0.35
+
+_DIGITS = re.compile(r"\d+")
+
+_forecast_cache = TTLCache(maxsize=1024, ttl=60 * 60)
+
+
+@dataclass
+class RecurringSeries:
+    account_id: Optional[int]
+    description: str
+    category: str
+    type: models.TransactionType
+    amount: float
+    period: str
+    occurrences: int
+    last_date: date
+    next_date: date
+
+
+@dataclass
+class ForecastModel:
+    today: date
+    series: List[RecurringSeries]
+    deltas: Dict[int, np.ndarray]  # account_id -> delta diário, índice 0 = hoje
+
+
+def _series_key(description: str) -> str:
+    return " ".join(_DIGITS.sub(" ", normalize_description(description)).split())
+
+
+def _add_months(day: date, months: int, anchor_day: int) -> date:
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    return date(year, month, min(anchor_day, monthrange(year, month)[1]))
+
+
+def _occurrences_after(series: RecurringSeries, start: date, end: date, step_days: int) -> List[date]:
+    """Datas futuras da série no intervalo (start, end]"""
+    dates = []
+    if series.period == "monthly":
+        k = 1
+        current = _add_months(series.last_date, k, series.last_date.day)
+        while current <= end:
+            if current > start:
+                dates.append(current)
+            k += 1
+            current = _add_months(series.last_date, k, series.last_date.day)
+    else:
+        current = series.last_date + timedelta(days=step_days)
+        while current <= end:
+            if current > start:
+                dates.append(current)
+            current += timedelta(days=step_days)
+    return dates
+
+
+def _detect(group_dates: np.ndarray, group_amounts: np.ndarray, today: date):
+    """Retorna (periodicidade, passo em dias) ou None se o grupo não for recorrente"""
+    if len(group_dates) < MIN_OCCURRENCES:
+        return None
+
+    intervals = np.diff(group_dates).astype("timedelta64[D]").astype(np.int64)
+    intervals = intervals[intervals > 0]  # lançamentos duplicados no mesmo dia
+    if len(intervals) < MIN_OCCURRENCES - 1:
+        return None
+
+    mean_amount = np.abs(group_amounts).mean()
+    if mean_amount == 0 or np.abs(group_amounts).std() / mean_amount > MAX_AMOUNT_VARIATION:
+        return None
+
+    median = float(np.median(intervals))
+    for period, (low, high) in PERIODS.items():
+        if low <= median <= high:
+            regular = np.mean((intervals >= low) & (intervals <= high))
+            last = group_dates[-1].astype(object)
+            # Série ativa: a última ocorrência não pode estar atrasada demais
+            if regular >= MIN_REGULARITY and (today - last).days <= high * 1.5:
+                return period, int(round(median))
+    return None
+
+
+def build_forecast_model(db: Session, user_id: int, today: date) -> ForecastModel:
+    """Detecta as séries recorrentes e calcula os deltas diários por conta"""
+    rows = db.execute(
+        select(
+            models.Transaction.account_id,
+            models.Transaction.date,
+            models.Transaction.amount,
+            models.Transaction.type,
+            models.Transaction.description,
+            models.Transaction.category,
+        )
+        .where(
+            models.Transaction.user_id == user_id,
+            models.Transaction.date >= today - timedelta(days=HISTORY_DAYS),
+            models.Transaction.date <= today,
+        )
+        .order_by(models.Transaction.date)
+    ).all()
+
+    groups: Dict[tuple, list] = {}
+    for account_id, tx_date, amount, tx_type, description, category in rows:
+        key = (account_id, tx_type, _series_key(description))
+        groups.setdefault(key, []).append((tx_date, amount, description, category))
+
+    horizon_end = today + timedelta(days=MAX_HORIZON_DAYS)
+    series: List[RecurringSeries] = []
+    deltas: Dict[int, np.ndarray] = {}
+    for (account_id, tx_type, _), entries in groups.items():
+        group_dates = np.array([entry[0] for entry in entries], dtype="datetime64[D]")
+        group_amounts = np.array([entry[1] for entry in entries], dtype=np.float64)
+        detected = _detect(group_dates, group_amounts, today)
+        if not detected:
+            continue
+        period, step_days = detected
+        last_date, _, description, category = entries[-1]
+        item = RecurringSeries(
+            account_id=account_id,
+            description=description,
+            category=category,
+            type=tx_type,
+            amount=round(float(np.median(group_amounts)), 2),
+            period=period,
+            occurrences=len(entries),
+            last_date=last_date,
+            next_date=last_date,
+        )
+        upcoming = _occurrences_after(item, today, horizon_end, step_days)
+        if not upcoming:
+            continue
+        item.next_date = upcoming[0]
+        series.append(item)
+
+        if account_id:
+            offsets = np.array([(day - today).days for day in upcoming], dtype=np.int64)
+            signed = item.amount if tx_type == models.TransactionType.income else -item.amount
+            account_deltas = deltas.setdefault(account_id, np.zeros(MAX_HORIZON_DAYS + 1))
+            np.add.at(account_deltas, offsets, signed)
+
+    series.sort(key=lambda item: item.next_date)
+    return ForecastModel(today=today, series=series, deltas=deltas)
+
+
+def get_forecast_model(db: Session, user_id: int, today: Optional[date] = None) -> ForecastModel:
+    """Modelo em cache do usuário, recalculado após novas transações ou na virada do dia"""
+    today = today or date.today()
+    model = _forecast_cache.get(user_id)
+    if model is None or model.today != today:
+        model = build_forecast_model(db, user_id, today)
+        _forecast_cache.set(user_id, model)
+    return model
+
+
+def invalidate_forecast(user_id: int):
+    """Chamado pelos caminhos que escrevem transações"""
+    _forecast_cache.invalidate(user_id)
+
+
+def project_balances(model: ForecastModel, accounts, horizon_days: int) -> List[dict]:
+    """Curva de saldo diária (hoje + horizon_days) para cada conta"""
+    days = np.arange(horizon_days + 1)
+    dates = [model.today + timedelta(days=int(offset)) for offset in days]
+    projections = []
+    for account_id, name, balance in accounts:
+        account_deltas = model.deltas.get(account_id)
+        if account_deltas is None:
+            curve = np.full(horizon_days + 1, balance, dtype=np.float64)
+        else:
+            curve = balance + np.cumsum(account_deltas[:horizon_days + 1])
+        projections.append({
+            "account_id": account_id,
+            "name": name,
+            "current_balance": balance,
+            "points": [
+                {"date": day, "balance": round(float(value), 2)}
+                for day, value in zip(dates, curve)
+            ],
+        })
+    return projections
@@ -0,0 +1,165 @@
+"""
+Importação de extratos bancários (CSV / OFX).
+
+Os arquivos são lidos linha a linha e convertidos em dicionários prontos para
+INSERT em lote. Cada linha recebe um hash de importação calculado sobre
+(user_id, date, amount, descrição normalizada); reimportar o mesmo extrato, ou
+um extrato com período sobreposto, gera os mesmos hashes e as linhas repetidas
+são ignoradas.
+"""
+import codecs
+import csv
+import enum
+import hashlib
+import re
+import unicodedata
+from datetime import date, datetime
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from app import models
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+class ImportFormat(str, enum.Enum):
+    csv = "csv"
+    ofx = "ofx"
+
+
+class StatementParseError(ValueError):
+    """Linha do extrato que não pôde ser interpretada"""
+
+
+_WHITESPACE = re.compile(r"\s+")
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def normalize_description(description: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados"""
+    text = unicodedata.normalize("NFKD", description)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def parse_amount(value: str) -> float:
+    """Aceita '1234.56', '-1.234,56' e '1234,56'"""
+    text = value.strip().replace(" ", "")
+    if "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        raise StatementParseError(f"Invalid amount: {value!r}")
+
+
+def parse_date(value: str) -> date:
+    """Aceita YYYY-MM-DD, DD/MM/YYYY e o formato OFX (YYYYMMDD[hhmmss...])"""
+    text = value.strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    if len(text) >= 8 and text[:8].isdigit():
+        try:
+            return datetime.strptime(text[:8], "%Y%m%d").date()
+        except ValueError:
+            pass
+    raise StatementParseError(f"Invalid date: {value!r}")
+
+
+def import_hash(user_id: int, tx_date: date, amount: float, normalized_description: str, occurrence: int) -> str:
+    """
+    Hash de deduplicação. `occurrence` diferencia lançamentos idênticos dentro do
+    mesmo extrato (dois cafés de mesmo valor no mesmo dia).
+    """
+    key = f"{user_id}|{tx_date.isoformat()}|{amount:.2f}|{normalized_description}|{occurrence}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _iter_csv(stream: BinaryIO, columns: Dict[str, str]) -> Iterator[Tuple[date, float, str, Optional[str]]]:
+    # Decodifica linha a linha: o SpooledTemporaryFile do upload não aceita
+    # io.TextIOWrapper em todas as versões do Python
+    text = codecs.iterdecode(stream, "utf-8-sig")
+    header_line = next(text, "")
+    # Bancos brasileiros costumam exportar com ';' como separador
+    delimiter = max((",", ";", "\t"), key=header_line.count)
+    header = [name.strip() for name in next(csv.reader([header_line], delimiter=delimiter), [])]
+    for field in ("date", "amount", "description"):
+        if columns[field] not in header:
+            raise StatementParseError(f"Missing column {columns[field]!r}")
+    reader = csv.DictReader(text, fieldnames=header, delimiter=delimiter)
+    line = 1
+    try:
+        for line, row in enumerate(reader, start=2):
+            try:
+                yield (
+                    parse_date(_csv_cell(row, columns["date"])),
+                    parse_amount(_csv_cell(row, columns["amount"])),
+                    _csv_cell(row, columns["description"]).strip(),
+                    (row.get(columns["category"]) or "").strip() or None,
+                )
+            except StatementParseError as exc:
+                raise StatementParseError(f"Line {line}: {exc}")
+    except csv.Error as exc:
+        # Ex.: campo acima do csv.field_size_limit() ou byte NUL (Python < 3.11),
+        # no registro seguinte ao último lido
+        raise StatementParseError(f"Line {line + 1}: {exc}")
+
+
+def _csv_cell(row: dict, column: str) -> str:
+    value = row[column]
+    if value is None:
+        # Linha com menos campos que o cabeçalho: o DictReader preenche com None
+        raise StatementParseError(f"missing {column!r}")
+    return value
+
+
+def _iter_ofx(stream: BinaryIO) -> Iterator[Tuple[date, float, str, Optional[str]]]:
+    current = None
+    for line in codecs.iterdecode(stream, "latin-1"):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    current = {}
+                elif current is not None:
+                    if "DTPOSTED" not in current or "TRNAMT" not in current:
+                        raise StatementParseError("OFX transaction without DTPOSTED/TRNAMT")
+                    yield (
+                        parse_date(current["DTPOSTED"]),
+                        parse_amount(current["TRNAMT"]),
+                        current.get("MEMO") or current.get("NAME") or "",
+                        None,
+                    )
+                    current = None
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def iter_statement_rows(
+    stream: BinaryIO,
+    format: ImportFormat,
+    user_id: int,
+    account_id: Optional[int],
+    default_category: str,
+    columns: Dict[str, str],
+) -> Iterator[dict]:
+    """Gera as linhas do extrato já no formato da tabela transactions"""
+    entries = _iter_ofx(stream) if format == ImportFormat.ofx else _iter_csv(stream, columns)
+    occurrences: Dict[Tuple[date, float, str], int] = {}
+    for tx_date, amount, description, category in entries:
+        normalized = normalize_description(description)
+        key = (tx_date, round(amount, 2), normalized)
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        yield {
+            "user_id": user_id,
+            "account_id": account_id,
+            "date": tx_date,
+            "amount": abs(amount),
+            "type": models.TransactionType.income if amount >= 0 else models.TransactionType.expense,
+            "description": description[:500] or "-",
+            "category": category or default_category,
+            "import_hash": import_hash(user_id, tx_date, amount, normalized, occurrence),
+        }
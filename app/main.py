@@ -1,6 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, accounts, credit_cards, transactions, investments, goals, shopping_lists, categories
+from app.auth import principal_cache, revocation_filter
+from app.autocomplete import suggestions_cache_stats
+from app.database import SessionLocal, async_engine, engine
+from app.metrics import MetricsMiddleware, metrics_response
+from app.pagination import NEXT_CURSOR_HEADER
+from app.query_inspection import QUERY_COUNT_HEADER, QUERY_INSPECTION, QueryInspectionMiddleware
+from app.passwords import password_pool
+from app.pool import pool_status
+from app.routers import auth, accounts, credit_cards, transactions, investments, goals, shopping_lists, categories, forecast, dashboard
 
 app = FastAPI(title="Cash Plan API", version="2.0.0")
 
@@ -10,7 +18,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER],
 )
+# Opcional (QUERY_INSPECTION=log|enforce); fica dentro do middleware de métricas
+if QUERY_INSPECTION in ("log", "enforce"):
+    app.add_middleware(QueryInspectionMiddleware, enforce=QUERY_INSPECTION == "enforce")
+app.add_middleware(MetricsMiddleware)
 
 # Auth router (não requer autenticação)
 app.include_router(auth.router)
@@ -23,6 +36,8 @@ app.include_router(investments.router)
 app.include_router(goals.router)
 app.include_router(shopping_lists.router)
 app.include_router(categories.router)
+app.include_router(forecast.router)
+app.include_router(dashboard.router)
 
 
 @app.get("/")
@@ -32,5 +47,39 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "caches": {"principal": principal_cache.stats(), "autocomplete": suggestions_cache_stats()},
+        "password_pool": password_pool.stats(),
+        "revocation_filter": revocation_filter.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas no formato texto do Prometheus"""
+    return metrics_response()
+
+
+@app.get("/health/db")
+def database_pool_status():
+    """Estado e contadores dos pools de conexão (síncrono e assíncrono)"""
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+
+@app.on_event("startup")
+def load_revocation_filter():
+    db = SessionLocal()
+    try:
+        revocation_filter.sync(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_pool.shutdown()
 
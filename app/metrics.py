@@ -0,0 +1,154 @@
+"""
+Métricas no formato do Prometheus, expostas em GET /metrics.
+
+Por rota (o template, ex. "/transactions/{transaction_id}", para não explodir a
+cardinalidade):
+    http_requests_total                  requisições por método, rota e status
+    http_request_duration_seconds        histograma de latência
+    http_request_db_statements           histograma de comandos SQL por requisição
+    http_request_db_duration_seconds     histograma do tempo gasto no banco por requisição
+Globais:
+    http_requests_in_progress            requisições em andamento, por método
+
+Os comandos SQL são contados pelos eventos do Engine (vale para o engine síncrono
+e para o assíncrono) e atribuídos à requisição corrente por um ContextVar, que
+acompanha o threadpool das rotas síncronas e as tasks das rotas async.
+
+Com vários workers, defina PROMETHEUS_MULTIPROC_DIR para agregar os processos.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+REQUESTS = Counter(
+    "http_requests_total", "Requisições HTTP", ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento", ["method"],
+    multiprocess_mode="livesum",
+)
+DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "Comandos SQL executados por requisição", ["method", "route"],
+    buckets=STATEMENT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Tempo gasto no banco por requisição", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+SKIPPED_PATHS = {"/metrics"}
+
+
+class RequestStats:
+    """Contadores de banco da requisição corrente"""
+    __slots__ = ("statements", "db_seconds", "recorded")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Contagem por SQL parametrizado, preenchida só com app.query_inspection ligado
+        self.recorded = None
+
+
+request_stats_var: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return request_stats_var.get()
+
+
+# O início de cada comando fica no próprio contexto de execução: um comando que
+# falha descarta o contexto junto, sem deixar nada acumulado na conexão
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._metrics_started_at
+    stats = request_stats_var.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+        if stats.recorded is not None:
+            stats.recorded[statement] += 1
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro (não interfere no ContextVar como o BaseHTTPMiddleware)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths = None
+
+    def _route_label(self, scope) -> str:
+        if self._route_paths is None:
+            router = scope["app"].router
+            self._route_paths = {
+                route.endpoint: route.path for route in router.routes if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(scope.get("endpoint"), UNMATCHED_ROUTE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in SKIPPED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = request_stats_var.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_PROGRESS.labels(method).dec()
+            request_stats_var.reset(token)
+
+            route = self._route_label(scope)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            LATENCY.labels(method, route).observe(elapsed)
+            DB_STATEMENTS.labels(method, route).observe(stats.statements)
+            DB_DURATION.labels(method, route).observe(stats.db_seconds)
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
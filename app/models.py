@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, ForeignKey, Text, Boolean
+from sqlalchemy import DDL, event, Column, Integer, String, Float, Date, DateTime, Enum, ForeignKey, Text, Boolean, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -41,6 +41,9 @@ class User(Base):
     goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan")
     shopping_lists = relationship("ShoppingList", back_populates="user", cascade="all, delete-orphan")
     categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
+    monthly_summaries = relationship("MonthlyCategorySummary", back_populates="user", cascade="all, delete-orphan")
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
+    item_prices = relationship("ItemPriceStat", back_populates="user", cascade="all, delete-orphan")
 
 
 class Account(Base):
@@ -87,12 +90,52 @@ class Transaction(Base):
     amount = Column(Float, nullable=False)
     type = Column(Enum(TransactionType), nullable=False)
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
+    import_hash = Column(String(64), nullable=True)  # Chave de deduplicação: extratos importados e compras de listas concluídas
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="transactions")
     account = relationship("Account", back_populates="transactions")
 
+    __table_args__ = (
+        # Suporta a paginação por cursor ordenada por (date, id) de cada usuário
+        Index("ix_transactions_user_id_date_id", "user_id", "date", "id"),
+        # Deduplicação da importação de extratos
+        Index("ix_transactions_user_id_import_hash", "user_id", "import_hash", unique=True),
+    )
+
+
+# Índices de busca textual (ver app/search.py), para bancos criados com
+# metadata.create_all; a migration 5b8e0d3a9c61 cria os mesmos. No SQLite, usado
+# em desenvolvimento, ficam em uma tabela FTS5.
+_POSTGRESQL_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_search_tsv ON transactions "
+    "USING gin (to_tsvector('portuguese', description || ' ' || category))",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_search_trgm ON transactions "
+    "USING gin ((description || ' ' || category) gin_trgm_ops)",
+]
+
+_SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, category, content='transactions', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, description, category) VALUES (new.id, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description, category) "
+    "VALUES ('delete', old.id, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description, category ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description, category) "
+    "VALUES ('delete', old.id, old.description, old.category); "
+    "INSERT INTO transactions_fts(rowid, description, category) VALUES (new.id, new.description, new.category); END",
+]
+
+for _statement in _POSTGRESQL_SEARCH_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+for _statement in _SQLITE_SEARCH_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
 
 class Investment(Base):
     __tablename__ = "investments"
@@ -140,7 +183,12 @@ class ShoppingList(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User", back_populates="shopping_lists")
-    items = relationship("ShoppingItem", back_populates="shopping_list", cascade="all, delete-orphan")
+    items = relationship(
+        "ShoppingItem",
+        back_populates="shopping_list",
+        cascade="all, delete-orphan",
+        order_by="(ShoppingItem.order, ShoppingItem.id)",
+    )
 
 
 class ShoppingItem(Base):
@@ -156,11 +204,17 @@ class ShoppingItem(Base):
     is_purchased = Column(Boolean, nullable=False, default=False)
     notes = Column(Text, nullable=True)  # Ex: "Preferir orgânico", "Marca X"
     order = Column(Integer, nullable=False, default=0)  # Para ordenação customizada
+    recorded_price = Column(Float, nullable=True)  # Preço já contado no histórico de preços (app/prices.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     shopping_list = relationship("ShoppingList", back_populates="items")
 
+    __table_args__ = (
+        # Itens de uma lista na ordem de exibição (listagem e paginação)
+        Index("ix_shopping_items_list_order", "shopping_list_id", "order", "id"),
+    )
+
 
 class Category(Base):
     __tablename__ = "categories"
@@ -174,3 +228,60 @@ class Category(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="categories")
+
+
+class MonthlyCategorySummary(Base):
+    """Totais de transações por mês e categoria, mantidos incrementalmente"""
+    __tablename__ = "monthly_category_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(String(7), nullable=False)  # Ex: "2025-10"
+    category = Column(String(255), nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+    user = relationship("User", back_populates="monthly_summaries")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category", "type", name="uq_monthly_category_summaries_key"),
+    )
+
+
+class RefreshToken(Base):
+    """Refresh token opaco (guardado como hash); tokens rotacionados da mesma sessão formam uma família"""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), unique=True, nullable=False, index=True)
+    family_id = Column(String(64), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # Rotacionado: não pode ser usado de novo
+    revoked_at = Column(DateTime(timezone=True), nullable=True, index=True)  # Sessão inteira revogada
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="refresh_tokens")
+
+
+class ItemPriceStat(Base):
+    """Histórico de preços pagos por item (nome normalizado), mantido incrementalmente"""
+    __tablename__ = "item_price_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    item_key = Column(String(255), nullable=False)  # Nome normalizado (minúsculas, sem acentos)
+    name = Column(String(255), nullable=False)  # Último nome como digitado
+    last_price = Column(Float, nullable=False)
+    total = Column(Float, nullable=False, default=0.0)  # Soma dos preços, para a média
+    count = Column(Integer, nullable=False, default=0)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    user = relationship("User", back_populates="item_prices")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "item_key", name="uq_item_price_stats_key"),
+    )
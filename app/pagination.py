@@ -0,0 +1,37 @@
+"""
+Paginação por cursor (keyset).
+
+O cursor é opaco para o cliente: codifica a chave de ordenação (date, id) do
+último registro da página anterior. A próxima página começa estritamente depois
+dessa chave, então o custo de cada página não depende da sua profundidade.
+"""
+import base64
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row_date: date, row_id: int) -> str:
+    """Codifica a chave (date, id) em um cursor opaco"""
+    raw = f"{row_date.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[date, int]]:
+    """Decodifica um cursor gerado por encode_cursor"""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        date_part, id_part = raw.split("|", 1)
+        return date.fromisoformat(date_part), int(id_part)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,100 @@
+"""
+Hash e verificação de senhas (bcrypt) em um pool dedicado.
+
+O bcrypt é propositalmente lento (dezenas a centenas de ms por operação). Rodando
+no threadpool padrão do AnyIO, uma rajada de logins ocupava as threads usadas
+por todas as outras rotas síncronas. Aqui o trabalho vai para um
+ThreadPoolExecutor próprio (o bcrypt libera o GIL, então as threads rodam em
+paralelo) com limite de fila: acima do limite a requisição é recusada na hora
+com 503 em vez de esperar indefinidamente.
+
+Configuração (variáveis de ambiente):
+    BCRYPT_ROUNDS               custo do bcrypt (padrão 12)
+    PASSWORD_HASH_WORKERS       threads do pool (padrão: número de CPUs)
+    PASSWORD_HASH_QUEUE_LIMIT   operações aguardando além das em execução (padrão 4x workers)
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", str(PASSWORD_HASH_WORKERS * 4)))
+
+# Hashes com custo diferente de BCRYPT_ROUNDS são marcados para atualização
+# e regravados no próximo login bem-sucedido
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def _truncate(password: str) -> str:
+    # Trunca a senha para 72 bytes (limite do bcrypt)
+    return password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(_truncate(password))
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(senha válida, novo hash se o custo configurado mudou)"""
+    return pwd_context.verify_and_update(_truncate(password), hashed_password)
+
+
+class PasswordHasherPool:
+    """Executor dedicado com limite de operações pendentes"""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Criado sob demanda: o app pode ser reiniciado no mesmo processo após shutdown
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, try again",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "queue_limit": self.queue_limit, "rejected": self.rejected}
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordHasherPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_and_update_async(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_pool.run(verify_and_update, password, hashed_password)
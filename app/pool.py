@@ -0,0 +1,162 @@
+"""
+Configuração e métricas dos pools de conexão.
+
+Variáveis de ambiente (valem para o engine síncrono e para o assíncrono;
+cada processo tem os dois, então o máximo de conexões por worker é o dobro):
+    DB_POOL_SIZE          conexões mantidas abertas (padrão 5)
+    DB_MAX_OVERFLOW       conexões extras sob pico (padrão 10)
+    DB_POOL_TIMEOUT       segundos esperando uma conexão livre antes de falhar (padrão 30)
+    DB_POOL_RECYCLE       recicla conexões mais antigas que isso, em segundos (padrão 1800; -1 desliga)
+    DB_POOL_PRE_PING      testa a conexão antes de entregá-la (padrão true)
+    DB_PGBOUNCER          modo PgBouncer em transaction pooling (padrão false): sem pool
+                          local (NullPool) e sem prepared statements no servidor, que não
+                          sobrevivem à troca de conexão entre transações
+"""
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+class PoolStats:
+    """Contadores de uso do pool (checkouts, espera por conexão, timeouts)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidated": self.invalidated,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds / self.waits * 1000, 3) if self.waits else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    """Mede quanto cada checkout esperou por uma conexão livre"""
+    stats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        # engine.dispose() troca o pool por uma cópia; os contadores continuam
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Argumentos de create_engine/create_async_engine conforme o ambiente"""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # SQLite usa os pools padrão do dialeto (arquivo ou memória)
+        return {}
+
+    if _env_bool("DB_PGBOUNCER", "false"):
+        options = {"poolclass": NullPool}
+        if is_async:
+            # asyncpg prepara e guarda statements por conexão; com PgBouncer
+            # a conexão do servidor muda a cada transação. Nomes únicos evitam
+            # colisão com statements deixados por outro cliente na mesma conexão
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "true"),
+    }
+
+
+def instrument(engine) -> PoolStats:
+    """Registra os contadores no pool do engine (síncrono ou sync_engine do assíncrono)"""
+    stats = PoolStats()
+    engine.pool_stats = stats
+    if isinstance(engine.pool, _WaitTimingMixin):
+        engine.pool.stats = stats
+    # Eventos registrados no engine valem também para os pools recriados por dispose()
+    for name, counter in (
+        ("connect", "connects"),
+        ("checkout", "checkouts"),
+        ("checkin", "checkins"),
+        ("invalidate", "invalidated"),
+    ):
+        event.listen(engine, name, lambda *args, _counter=counter: stats.incr(_counter))
+    return stats
+
+
+def pool_status(engine) -> dict:
+    """Estado atual do pool + contadores acumulados"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    stats = getattr(engine, "pool_stats", None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
@@ -0,0 +1,127 @@
+"""
+Histórico de preços dos itens de compra, por usuário e nome normalizado.
+
+Fica na tabela item_price_stats (último preço, soma, contagem, mínimo e máximo)
+e é mantido incrementalmente: cada item que passa a estar comprado com preço
+real é uma observação, gravada com INSERT ... ON CONFLICT DO UPDATE. A
+estimativa de preço de um item novo lê uma única linha pelo índice único
+(user_id, item_key), sem varrer os itens antigos.
+
+Só preços reais entram no histórico (estimativas não). O item guarda em
+`ShoppingItem.recorded_price` o preço que já contou, então cada item é uma
+única observação: desmarcar e marcar de novo não conta outra vez, e corrigir o
+preço de um item já registrado troca o último preço e ajusta a soma (mínimo e
+máximo só se expandem). Renomear o item começa uma observação nova.
+"""
+from typing import Dict, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.imports import normalize_description
+
+
+def normalize_item_name(name: str) -> str:
+    """Chave do histórico: "Feijão  Preto" e "feijao preto" são o mesmo item"""
+    return normalize_description(name)
+
+
+def purchased_price(is_purchased: bool, actual_price: Optional[float]) -> Optional[float]:
+    """Preço que conta como observação: item comprado com preço real informado"""
+    if is_purchased and actual_price:
+        return actual_price
+    return None
+
+
+class PriceHistoryDeltas:
+    """Acumula observações por item para gravar um upsert por lote"""
+
+    def __init__(self):
+        self._entries: Dict[str, dict] = {}
+
+    def add(self, name: str, price: Optional[float]):
+        if not price:
+            return
+        key = normalize_item_name(name)
+        if not key:
+            return
+        self._merge(key, name, price, price, 1)
+
+    def correct(self, name: str, old_price: float, price: float):
+        """Troca o preço de uma observação já gravada (a contagem não muda)"""
+        key = normalize_item_name(name)
+        if key:
+            self._merge(key, name, price, price - old_price, 0)
+
+    def _merge(self, key: str, name: str, price: float, total: float, count: int):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = {
+                "item_key": key, "name": name.strip(), "last_price": price,
+                "total": total, "count": count, "min_price": price, "max_price": price,
+            }
+            return
+        entry["name"] = name.strip()
+        entry["last_price"] = price
+        entry["total"] += total
+        entry["count"] += count
+        entry["min_price"] = min(entry["min_price"], price)
+        entry["max_price"] = max(entry["max_price"], price)
+
+    def add_transition(self, old_name: str, recorded_price: Optional[float], name: str,
+                       is_purchased: bool, actual_price: Optional[float]) -> Optional[float]:
+        """
+        Registra o estado novo de um item já existente e devolve o novo
+        `recorded_price` dele: observação nova, correção de preço ou nada
+        """
+        if normalize_item_name(old_name) != normalize_item_name(name):
+            recorded_price = None
+        price = purchased_price(is_purchased, actual_price)
+        if price is None or price == recorded_price:
+            return recorded_price
+        if recorded_price is None:
+            self.add(name, price)
+        else:
+            self.correct(name, recorded_price, price)
+        return price
+
+    def apply(self, db: Session, user_id: int):
+        """Grava as observações com INSERT ... ON CONFLICT DO UPDATE"""
+        rows = [dict(entry, user_id=user_id) for entry in self._entries.values()]
+        self._entries.clear()
+        if not rows:
+            return
+
+        table = models.ItemPriceStat.__table__
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "item_key"],
+            set_={
+                "name": stmt.excluded.name,
+                "last_price": stmt.excluded.last_price,
+                "total": table.c.total + stmt.excluded.total,
+                "count": table.c.count + stmt.excluded.count,
+                "min_price": case(
+                    (stmt.excluded.min_price < table.c.min_price, stmt.excluded.min_price),
+                    else_=table.c.min_price,
+                ),
+                "max_price": case(
+                    (stmt.excluded.max_price > table.c.max_price, stmt.excluded.max_price),
+                    else_=table.c.max_price,
+                ),
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt, rows)
+
+
+def get_price_stats(db: Session, user_id: int, name: str) -> Optional[models.ItemPriceStat]:
+    """Histórico do item; None sem observações (uma correção sem histórico grava contagem 0)"""
+    return db.query(models.ItemPriceStat).filter(
+        models.ItemPriceStat.user_id == user_id,
+        models.ItemPriceStat.item_key == normalize_item_name(name),
+        models.ItemPriceStat.count > 0
+    ).first()
@@ -0,0 +1,128 @@
+"""
+Inspeção das consultas de cada requisição: detector de N+1 e orçamento por rota.
+
+Desligado por padrão. QUERY_INSPECTION liga o modo:
+    log       registra os comandos de cada requisição, devolve X-Query-Count e
+              loga comandos parametrizados repetidos (N+1) e estouros de orçamento
+    enforce   como `log`, mas a requisição que estoura o orçamento da rota
+              falha com 500 (para os testes pegarem regressões)
+
+O orçamento é declarado na rota com @query_budget(n), logo abaixo do decorator
+do router. Ele conta só os comandos do handler: a autenticação pode somar até
+AUTH_QUERY_ALLOWANCE (cache do principal e sincronização das revogações frios).
+
+Um comando é "repetido" quando o mesmo SQL parametrizado roda ao menos
+QUERY_REPEAT_THRESHOLD vezes na mesma requisição — o padrão de um lazy load ou
+de uma consulta dentro de um loop.
+"""
+import json
+import logging
+import os
+from collections import Counter
+from typing import Callable, List
+
+from app.metrics import RequestStats, current_request_stats, request_stats_var
+
+logger = logging.getLogger(__name__)
+
+QUERY_INSPECTION = os.getenv("QUERY_INSPECTION", "off").strip().lower()
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+AUTH_QUERY_ALLOWANCE = 2
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+def query_budget(max_statements: int) -> Callable:
+    """Declara quantos comandos SQL o handler pode executar"""
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_statements
+        return endpoint
+    return decorator
+
+
+def repeated_statements(recorded: Counter) -> List[dict]:
+    return [
+        {"statement": statement, "count": count}
+        for statement, count in recorded.most_common()
+        if count >= QUERY_REPEAT_THRESHOLD
+    ]
+
+
+class QueryInspectionMiddleware:
+    """Middleware ASGI; precisa ficar dentro do MetricsMiddleware (adicionado antes dele)"""
+
+    def __init__(self, app, enforce: bool = False):
+        self.app = app
+        self.enforce = enforce
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_request_stats()
+        token = None
+        if stats is None:
+            stats = RequestStats()
+            token = request_stats_var.set(stats)
+        stats.recorded = Counter()
+        blocked = False
+
+        async def send_wrapper(message):
+            nonlocal blocked
+            if blocked:
+                return
+            if message["type"] == "http.response.start":
+                # O handler já terminou (exceto em streaming): todos os comandos foram contados
+                violation = self._check(scope, stats)
+                if violation and self.enforce:
+                    blocked = True
+                    await self._send_violation(send, violation)
+                    return
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (QUERY_COUNT_HEADER.lower().encode("latin-1"), str(stats.statements).encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                request_stats_var.reset(token)
+
+    def _check(self, scope, stats: RequestStats):
+        endpoint = scope.get("endpoint")
+        route = f'{scope["method"]} {scope["path"]}'
+        repeated = repeated_statements(stats.recorded)
+        for item in repeated:
+            logger.warning("Possible N+1 on %s: %d x %s", route, item["count"], item["statement"])
+
+        budget = getattr(endpoint, "__query_budget__", None)
+        if budget is None or stats.statements <= budget + AUTH_QUERY_ALLOWANCE:
+            return None
+
+        logger.warning(
+            "Query budget exceeded on %s: %d statements (budget %d + %d auth)",
+            route, stats.statements, budget, AUTH_QUERY_ALLOWANCE,
+        )
+        return {
+            "detail": "Query budget exceeded",
+            "route": route,
+            "statements": stats.statements,
+            "budget": budget,
+            "auth_allowance": AUTH_QUERY_ALLOWANCE,
+            "repeated": repeated,
+        }
+
+    async def _send_violation(self, send, violation: dict):
+        body = json.dumps(violation).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,125 @@
+"""
+Filtro em memória de sessões revogadas.
+
+Cada access token carrega o id da sessão (`sid`, a família de refresh tokens
+criada no login). Revogar a sessão (logout, reuso de refresh token) precisa
+invalidar os access tokens já emitidos, mas consultar o banco a cada requisição
+anularia o ganho do cache de principal. A verificação é feita aqui:
+
+- um Bloom filter responde "certamente não revogado" para quase todos os tokens
+  sem tocar no conjunto exato;
+- um dicionário exato (sid -> expiração) confirma os positivos, eliminando os
+  falsos positivos do Bloom.
+
+Uma sessão só precisa ficar no filtro até o último access token dela expirar,
+ou seja, ACCESS_TOKEN_EXPIRE_MINUTES após a revogação. O filtro é carregado na
+subida do processo e sincronizado de forma incremental com o banco a cada
+REVOCATION_SYNC_SECONDS, para enxergar revogações feitas por outros workers.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import RefreshToken
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationFilter:
+    def __init__(self, ttl_seconds: float, capacity: int = 100_000, sync_seconds: float = 30):
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity)
+        self._revoked: dict = {}
+        self._lock = threading.Lock()
+        self._synced_at: Optional[float] = None
+        self._synced_until: Optional[datetime] = None
+        self.syncs = 0
+
+    def add(self, sid: str, expires_at: float):
+        """Marca a sessão como revogada até `expires_at` (epoch)"""
+        with self._lock:
+            if expires_at > self._revoked.get(sid, 0):
+                self._revoked[sid] = expires_at
+            self._bloom.add(sid)
+
+    def revoke(self, sid: str):
+        self.add(sid, time.time() + self.ttl_seconds)
+
+    def is_revoked(self, sid: Optional[str]) -> bool:
+        if not sid or sid not in self._bloom:
+            return False
+        expires_at = self._revoked.get(sid)
+        return expires_at is not None and expires_at > time.time()
+
+    def prune(self):
+        """Descarta sessões cujos access tokens já expiraram e reconstrói o Bloom"""
+        now = time.time()
+        with self._lock:
+            self._revoked = {sid: exp for sid, exp in self._revoked.items() if exp > now}
+            bloom = BloomFilter(max(self.capacity, len(self._revoked) * 2))
+            for sid in self._revoked:
+                bloom.add(sid)
+            self._bloom = bloom
+
+    def sync(self, db: Session):
+        """Carrega do banco as revogações ainda relevantes (incremental após a primeira)"""
+        now = datetime.now(timezone.utc)
+        since = self._synced_until or now - timedelta(seconds=self.ttl_seconds)
+        rows = (
+            db.query(RefreshToken.family_id, RefreshToken.revoked_at)
+            .filter(RefreshToken.revoked_at.isnot(None), RefreshToken.revoked_at >= since)
+            .distinct()
+            .all()
+        )
+        for family_id, revoked_at in rows:
+            if revoked_at.tzinfo is None:
+                revoked_at = revoked_at.replace(tzinfo=timezone.utc)
+            self.add(family_id, revoked_at.timestamp() + self.ttl_seconds)
+
+        # Sobreposição de alguns segundos para não perder commits concorrentes
+        self._synced_until = now - timedelta(seconds=5)
+        self.prune()
+        self._synced_at = time.monotonic()
+        self.syncs += 1
+
+    def is_stale(self) -> bool:
+        synced_at = self._synced_at
+        return synced_at is None or time.monotonic() - synced_at > self.sync_seconds
+
+    def sync_if_stale(self, db: Session):
+        if self.is_stale():
+            self.sync(db)
+
+    def stats(self) -> dict:
+        return {
+            "revoked_sessions": len(self._revoked),
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hashes,
+            "syncs": self.syncs,
+        }
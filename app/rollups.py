@@ -0,0 +1,73 @@
+"""
+Resumo mensal por categoria (tabela monthly_category_summaries).
+
+Os caminhos que escrevem transações acumulam deltas em um SummaryDeltas e os
+aplicam com um upsert por chave (user_id, month, category, type), dentro da
+mesma transação do banco. Assim o resumo nunca precisa reler as transações.
+"""
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def month_of(value) -> str:
+    """'YYYY-MM' a partir de date, datetime ou string ISO"""
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return str(value)[:7]
+
+
+class SummaryDeltas:
+    """Acumula as variações do resumo mensal antes de gravá-las"""
+
+    def __init__(self):
+        self._deltas: Dict[Tuple[str, str, str], list] = defaultdict(lambda: [0.0, 0])
+
+    def add(self, tx_date, category: str, type, amount: float, sign: int = 1):
+        type = models.TransactionType(type)
+        entry = self._deltas[(month_of(tx_date), category, type.value)]
+        entry[0] += sign * amount
+        entry[1] += sign
+
+    def remove(self, tx_date, category: str, type, amount: float):
+        self.add(tx_date, category, type, amount, sign=-1)
+
+    def add_transaction(self, transaction: models.Transaction, sign: int = 1):
+        self.add(transaction.date, transaction.category, transaction.type, transaction.amount, sign)
+
+    def remove_transaction(self, transaction: models.Transaction):
+        self.add_transaction(transaction, sign=-1)
+
+    def apply(self, db: Session, user_id: int):
+        """Grava os deltas com INSERT ... ON CONFLICT DO UPDATE"""
+        rows = [
+            {
+                "user_id": user_id,
+                "month": month,
+                "category": category,
+                "type": models.TransactionType(type),
+                "total": total,
+                "count": count,
+            }
+            for (month, category, type), (total, count) in self._deltas.items()
+            if total or count
+        ]
+        self._deltas.clear()
+        if not rows:
+            return
+
+        table = models.MonthlyCategorySummary.__table__
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "month", "category", "type"],
+            set_={
+                "total": table.c.total + stmt.excluded.total,
+                "count": table.c.count + stmt.excluded.count,
+            },
+        )
+        db.execute(stmt, rows)
@@ -1,36 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
-from app.auth import get_current_active_user
+from app.auth import Principal, get_current_active_user
+from app.query_inspection import query_budget
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
 
 @router.get("/", response_model=List[schemas.Account])
-def get_accounts(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+@query_budget(1)
+async def get_accounts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna todas as contas do usuário autenticado"""
-    accounts = db.query(models.Account).filter(
+    accounts = (await db.scalars(select(models.Account).where(
         models.Account.user_id == current_user.id
-    ).all()
+    ))).all()
     return accounts
 
 
 @router.get("/{account_id}", response_model=schemas.Account)
-def get_account(
+@query_budget(1)
+async def get_account(
     account_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna uma conta específica do usuário"""
-    account = db.query(models.Account).filter(
+    account = (await db.scalars(select(models.Account).where(
         models.Account.id == account_id,
         models.Account.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
@@ -38,10 +42,10 @@ def get_account(
 
 
 @router.post("/", response_model=schemas.Account, status_code=status.HTTP_201_CREATED)
-def create_account(
+async def create_account(
     account: schemas.AccountCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria uma nova conta para o usuário autenticado"""
     db_account = models.Account(
@@ -49,23 +53,23 @@ def create_account(
         user_id=current_user.id
     )
     db.add(db_account)
-    db.commit()
-    db.refresh(db_account)
+    await db.commit()
+    await db.refresh(db_account)
     return db_account
 
 
 @router.put("/{account_id}", response_model=schemas.Account)
-def update_account(
+async def update_account(
     account_id: int,
     account: schemas.AccountUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza uma conta do usuário"""
-    db_account = db.query(models.Account).filter(
+    db_account = (await db.scalars(select(models.Account).where(
         models.Account.id == account_id,
         models.Account.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_account:
         raise HTTPException(status_code=404, detail="Account not found")
@@ -74,27 +78,27 @@ def update_account(
     for key, value in update_data.items():
         setattr(db_account, key, value)
     
-    db.commit()
-    db.refresh(db_account)
+    await db.commit()
+    await db.refresh(db_account)
     return db_account
 
 
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_account(
+async def delete_account(
     account_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta uma conta do usuário"""
-    db_account = db.query(models.Account).filter(
+    db_account = (await db.scalars(select(models.Account).where(
         models.Account.id == account_id,
         models.Account.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_account:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    db.delete(db_account)
-    db.commit()
+    await db.delete(db_account)
+    await db.commit()
     return None
 
@@ -1,25 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import schemas
 from app.models import User
-from app.database import get_db
+from app.database import get_async_db
 from app.auth import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    get_current_active_user
+    Principal,
+    get_current_active_user,
+    get_token_claims,
+    issue_tokens,
+    revoke_session,
+    rotate_refresh_token
 )
+from app.query_inspection import query_budget
+from app.passwords import hash_password_async, verify_and_update_async
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
-    """Registra um novo usuário"""
-    
+async def _ensure_available(db: AsyncSession, user_data: schemas.UserCreate):
     # Verifica se o email já existe
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    db_user = (await db.scalars(select(User.id).where(User.email == user_data.email))).first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -27,15 +29,15 @@ def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
         )
     
     # Verifica se o username já existe
-    db_user = db.query(User).filter(User.username == user_data.username).first()
+    db_user = (await db.scalars(select(User.id).where(User.username == user_data.username))).first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
-    
-    # Cria o novo usuário
-    hashed_password = get_password_hash(user_data.password)
+
+
+async def _create_user(db: AsyncSession, user_data: schemas.UserCreate, hashed_password: str) -> User:
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -45,21 +47,37 @@ def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
+# O bcrypt roda no pool dedicado de app.passwords, que recusa com 503 quando lotado;
+# o restante das rotas usa a sessão assíncrona.
+
+@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+async def register(user_data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Registra um novo usuário"""
+    await _ensure_available(db, user_data)
+    
+    # Cria o novo usuário
+    hashed_password = await hash_password_async(user_data.password)
+    return await _create_user(db, user_data, hashed_password)
+
+
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Realiza login e retorna token JWT"""
     
     # Busca o usuário pelo username
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = (await db.scalars(select(User).where(User.username == form_data.username))).first()
     
     # Verifica se o usuário existe e a senha está correta
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_async(form_data.password, user.hashed_password)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -73,20 +91,49 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="Inactive user"
         )
     
-    # Cria o token JWT
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # BCRYPT_ROUNDS mudou desde que o hash foi gerado: regrava com o custo atual
+    if new_hash:
+        user.hashed_password = new_hash
+    
+    # Abre uma nova sessão: access token curto + refresh token (o commit grava também o rehash)
+    return await db.run_sync(issue_tokens, user.id)
+
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(payload: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Troca o refresh token por um novo par (o token apresentado deixa de valer)"""
+    user_id, family_id = await db.run_sync(rotate_refresh_token, payload.refresh_token)
+    
+    is_active = await db.scalar(select(User.is_active).where(User.id == user_id))
+    if not is_active:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await db.run_sync(issue_tokens, user_id, family_id)
 
 
 @router.get("/me", response_model=schemas.User)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+@query_budget(1)
+async def get_current_user_info(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Retorna informações do usuário autenticado"""
-    return current_user
+    user = (await db.scalars(select(User).where(User.id == current_user.id))).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 
 @router.post("/logout")
-def logout():
-    """Endpoint de logout (client-side deve descartar o token)"""
+async def logout(claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_async_db)):
+    """Revoga a sessão: refresh tokens e access tokens já emitidos deixam de valer"""
+    # Tokens emitidos antes das sessões não têm sid e apenas expiram
+    if claims.get("sid"):
+        await db.run_sync(revoke_session, claims["sid"])
     return {"message": "Successfully logged out"}
 
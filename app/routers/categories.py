@@ -1,45 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
-from app.auth import get_current_active_user
+from app.auth import Principal, get_current_active_user
+from app.query_inspection import query_budget
+from app.serialization import CATEGORY_COLUMNS, as_dicts, categories_adapter, json_response
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 
 @router.get("/", response_model=List[schemas.Category])
-def get_categories(
+@query_budget(1)
+async def get_categories(
     type: str = None,  # Filtrar por tipo: "income" ou "expense"
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Retorna todas as categorias do usuário autenticado (padrão + customizadas)
     Opcionalmente filtra por tipo (income/expense)
     """
-    query = db.query(models.Category).filter(
+    stmt = select(*CATEGORY_COLUMNS).where(
         models.Category.user_id == current_user.id
     )
     
     if type:
-        query = query.filter(models.Category.type == type)
+        stmt = stmt.where(models.Category.type == type)
     
-    categories = query.all()
-    return categories
+    categories = as_dicts(await db.execute(stmt), CATEGORY_COLUMNS)
+    return json_response(categories_adapter, categories)
 
 
 @router.get("/{category_id}", response_model=schemas.Category)
-def get_category(
+async def get_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna uma categoria específica do usuário"""
-    category = db.query(models.Category).filter(
+    category = (await db.scalars(select(models.Category).where(
         models.Category.id == category_id,
         models.Category.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -47,18 +51,18 @@ def get_category(
 
 
 @router.post("/", response_model=schemas.Category, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     category: schemas.CategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria uma nova categoria customizada para o usuário"""
     # Verificar se já existe uma categoria com esse nome para o usuário
-    existing = db.query(models.Category).filter(
+    existing = (await db.scalars(select(models.Category).where(
         models.Category.user_id == current_user.id,
         models.Category.name == category.name,
         models.Category.type == category.type
-    ).first()
+    ))).first()
     
     if existing:
         raise HTTPException(
@@ -72,23 +76,23 @@ def create_category(
         is_default=False  # Categorias criadas pelo usuário nunca são padrão
     )
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await db.commit()
+    await db.refresh(db_category)
     return db_category
 
 
 @router.put("/{category_id}", response_model=schemas.Category)
-def update_category(
+async def update_category(
     category_id: int,
     category: schemas.CategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza uma categoria customizada do usuário"""
-    db_category = db.query(models.Category).filter(
+    db_category = (await db.scalars(select(models.Category).where(
         models.Category.id == category_id,
         models.Category.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -104,22 +108,22 @@ def update_category(
     for key, value in update_data.items():
         setattr(db_category, key, value)
     
-    db.commit()
-    db.refresh(db_category)
+    await db.commit()
+    await db.refresh(db_category)
     return db_category
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta uma categoria customizada do usuário"""
-    db_category = db.query(models.Category).filter(
+    db_category = (await db.scalars(select(models.Category).where(
         models.Category.id == category_id,
         models.Category.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -131,7 +135,7 @@ def delete_category(
             detail="Não é possível deletar categorias padrão do sistema"
         )
     
-    db.delete(db_category)
-    db.commit()
+    await db.delete(db_category)
+    await db.commit()
     return None
 
@@ -1,36 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
-from app.auth import get_current_active_user
+from app.auth import Principal, get_current_active_user
 
 router = APIRouter(prefix="/credit-cards", tags=["credit_cards"])
 
 
 @router.get("/", response_model=List[schemas.CreditCard])
-def get_credit_cards(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+async def get_credit_cards(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna todos os cartões do usuário autenticado"""
-    cards = db.query(models.CreditCard).filter(
+    cards = (await db.scalars(select(models.CreditCard).where(
         models.CreditCard.user_id == current_user.id
-    ).all()
+    ))).all()
     return cards
 
 
 @router.get("/{card_id}", response_model=schemas.CreditCard)
-def get_credit_card(
+async def get_credit_card(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna um cartão específico do usuário"""
-    card = db.query(models.CreditCard).filter(
+    card = (await db.scalars(select(models.CreditCard).where(
         models.CreditCard.id == card_id,
         models.CreditCard.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not card:
         raise HTTPException(status_code=404, detail="Credit card not found")
@@ -38,10 +39,10 @@ def get_credit_card(
 
 
 @router.post("/", response_model=schemas.CreditCard, status_code=status.HTTP_201_CREATED)
-def create_credit_card(
+async def create_credit_card(
     card: schemas.CreditCardCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria um novo cartão para o usuário autenticado"""
     db_card = models.CreditCard(
@@ -49,23 +50,23 @@ def create_credit_card(
         user_id=current_user.id
     )
     db.add(db_card)
-    db.commit()
-    db.refresh(db_card)
+    await db.commit()
+    await db.refresh(db_card)
     return db_card
 
 
 @router.put("/{card_id}", response_model=schemas.CreditCard)
-def update_credit_card(
+async def update_credit_card(
     card_id: int,
     card: schemas.CreditCardUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza um cartão do usuário"""
-    db_card = db.query(models.CreditCard).filter(
+    db_card = (await db.scalars(select(models.CreditCard).where(
         models.CreditCard.id == card_id,
         models.CreditCard.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_card:
         raise HTTPException(status_code=404, detail="Credit card not found")
@@ -74,26 +75,26 @@ def update_credit_card(
     for key, value in update_data.items():
         setattr(db_card, key, value)
     
-    db.commit()
-    db.refresh(db_card)
+    await db.commit()
+    await db.refresh(db_card)
     return db_card
 
 
 @router.delete("/{card_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_credit_card(
+async def delete_credit_card(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta um cartão do usuário"""
-    db_card = db.query(models.CreditCard).filter(
+    db_card = (await db.scalars(select(models.CreditCard).where(
         models.CreditCard.id == card_id,
         models.CreditCard.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_card:
         raise HTTPException(status_code=404, detail="Credit card not found")
     
-    db.delete(db_card)
-    db.commit()
+    await db.delete(db_card)
+    await db.commit()
     return None
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends
+from sqlalchemy import case, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app import models, schemas
+from app.auth import Principal, get_current_active_user
+from app.query_inspection import query_budget
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+# Cada agregado é uma subconsulta de uma linha; o dashboard junta todas em um
+# único SELECT (uma ida ao banco e uma conexão do pool por requisição)
+
+def _accounts_totals(user_id: int):
+    return select(
+        func.count(models.Account.id).label("accounts_count"),
+        func.coalesce(func.sum(models.Account.balance), 0.0).label("accounts_balance"),
+        func.coalesce(func.sum(models.Account.investments), 0.0).label("accounts_investments"),
+    ).where(models.Account.user_id == user_id).subquery()
+
+
+def _credit_cards_totals(user_id: int):
+    return select(
+        func.count(models.CreditCard.id).label("cards_count"),
+        func.coalesce(func.sum(models.CreditCard.used), 0).label("cards_used"),
+        func.coalesce(func.sum(models.CreditCard.limit), 0).label("cards_limit"),
+    ).where(models.CreditCard.user_id == user_id).subquery()
+
+
+def _investments_totals(user_id: int):
+    return select(
+        func.count(models.Investment.id).label("investments_count"),
+        func.coalesce(func.sum(models.Investment.value), 0.0).label("investments_value"),
+    ).where(models.Investment.user_id == user_id).subquery()
+
+
+def _goals_totals(user_id: int):
+    return select(
+        func.count(models.Goal.id).label("goals_count"),
+        func.coalesce(func.sum(models.Goal.current), 0.0).label("goals_current"),
+        func.coalesce(func.sum(models.Goal.target), 0.0).label("goals_target"),
+    ).where(models.Goal.user_id == user_id).subquery()
+
+
+def _month_to_date_totals(user_id: int, today: date):
+    # Lido do resumo mensal (custo proporcional ao número de categorias do mês),
+    # que cobre o mês inteiro: as transações agendadas para depois de hoje são
+    # descontadas, lidas pelo índice (user_id, date, id)
+    summary = models.MonthlyCategorySummary
+    transaction = models.Transaction
+    month_totals = select(
+        func.coalesce(func.sum(case((summary.type == models.TransactionType.income, summary.total), else_=0.0)), 0.0).label("income"),
+        func.coalesce(func.sum(case((summary.type == models.TransactionType.expense, summary.total), else_=0.0)), 0.0).label("expense"),
+    ).where(summary.user_id == user_id, summary.month == today.strftime("%Y-%m")).subquery()
+    next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    scheduled = select(
+        func.coalesce(func.sum(case((transaction.type == models.TransactionType.income, transaction.amount), else_=0.0)), 0.0).label("income"),
+        func.coalesce(func.sum(case((transaction.type == models.TransactionType.expense, transaction.amount), else_=0.0)), 0.0).label("expense"),
+    ).where(
+        transaction.user_id == user_id,
+        transaction.date > today,
+        transaction.date < next_month,
+    ).subquery()
+    return select(
+        (month_totals.c.income - scheduled.c.income).label("month_income"),
+        (month_totals.c.expense - scheduled.c.expense).label("month_expense"),
+    ).select_from(month_totals.join(scheduled, true())).subquery()
+
+
+def _shopping_lists_totals(user_id: int):
+    return select(
+        func.count(models.ShoppingList.id).label("shopping_active"),
+        func.coalesce(func.sum(models.ShoppingList.total_estimated), 0.0).label("shopping_estimated"),
+    ).where(
+        models.ShoppingList.user_id == user_id,
+        models.ShoppingList.status == models.ShoppingListStatus.active,
+    ).subquery()
+
+
+@router.get("/", response_model=schemas.Dashboard)
+@query_budget(1)
+async def get_dashboard(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Resumo da tela inicial em uma única requisição: autentica uma vez e lê os
+    agregados de todas as entidades em um único SELECT
+    """
+    user_id = current_user.id
+    today = date.today()
+    month = today.strftime("%Y-%m")
+    parts = [
+        _accounts_totals(user_id),
+        _credit_cards_totals(user_id),
+        _investments_totals(user_id),
+        _goals_totals(user_id),
+        _month_to_date_totals(user_id, today),
+        _shopping_lists_totals(user_id),
+    ]
+    # Subconsultas de uma linha: o JOIN ON TRUE só as coloca lado a lado
+    joined = parts[0]
+    for part in parts[1:]:
+        joined = joined.join(part, true())
+    row = (await db.execute(
+        select(*(column for part in parts for column in part.c)).select_from(joined)
+    )).one()
+
+    # Cartões guardam valores em centavos
+    net_worth = (
+        row.accounts_balance
+        + row.accounts_investments
+        + row.investments_value
+        - row.cards_used / 100
+    )
+
+    return {
+        "net_worth": net_worth,
+        "accounts": {
+            "count": row.accounts_count,
+            "balance": row.accounts_balance,
+            "investments": row.accounts_investments,
+        },
+        "credit_cards": {
+            "count": row.cards_count,
+            "used": row.cards_used,
+            "limit": row.cards_limit,
+            "utilization": row.cards_used / row.cards_limit if row.cards_limit else 0.0,
+        },
+        "investments": {"count": row.investments_count, "value": row.investments_value},
+        "goals": {"count": row.goals_count, "current": row.goals_current, "target": row.goals_target},
+        "month_to_date": {
+            "month": month,
+            "income": row.month_income,
+            "expense": row.month_expense,
+            "net": row.month_income - row.month_expense,
+        },
+        "shopping_lists": {"active": row.shopping_active, "total_estimated": row.shopping_estimated},
+    }
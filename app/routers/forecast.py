@@ -0,0 +1,39 @@
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app import models, schemas
+from app.auth import Principal, get_current_active_user
+from app.query_inspection import query_budget
+from app.forecast import MAX_HORIZON_DAYS, get_forecast_model, project_balances
+
+router = APIRouter(prefix="/forecast", tags=["forecast"])
+
+
+@router.get("/", response_model=schemas.Forecast)
+@query_budget(2)
+def get_forecast(
+    horizon_days: int = Query(90, ge=1, le=MAX_HORIZON_DAYS),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Projeta o saldo diário de cada conta para os próximos `horizon_days` dias
+    a partir das transações recorrentes detectadas no histórico
+    """
+    model = get_forecast_model(db, current_user.id)
+    
+    accounts = db.query(
+        models.Account.id,
+        models.Account.name,
+        models.Account.balance
+    ).filter(
+        models.Account.user_id == current_user.id
+    ).order_by(models.Account.id).all()
+    
+    return {
+        "today": model.today,
+        "horizon_days": horizon_days,
+        "accounts": project_balances(model, accounts, horizon_days),
+        "series": [asdict(item) for item in model.series],
+    }
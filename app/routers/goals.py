@@ -1,36 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
-from app.auth import get_current_active_user
+from app.auth import Principal, get_current_active_user
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
 
 @router.get("/", response_model=List[schemas.Goal])
-def get_goals(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+async def get_goals(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna todas as metas do usuário autenticado"""
-    goals = db.query(models.Goal).filter(
+    goals = (await db.scalars(select(models.Goal).where(
         models.Goal.user_id == current_user.id
-    ).all()
+    ))).all()
     return goals
 
 
 @router.get("/{goal_id}", response_model=schemas.Goal)
-def get_goal(
+async def get_goal(
     goal_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna uma meta específica do usuário"""
-    goal = db.query(models.Goal).filter(
+    goal = (await db.scalars(select(models.Goal).where(
         models.Goal.id == goal_id,
         models.Goal.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
@@ -38,10 +39,10 @@ def get_goal(
 
 
 @router.post("/", response_model=schemas.Goal, status_code=status.HTTP_201_CREATED)
-def create_goal(
+async def create_goal(
     goal: schemas.GoalCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria uma nova meta para o usuário autenticado"""
     db_goal = models.Goal(
@@ -49,23 +50,23 @@ def create_goal(
         user_id=current_user.id
     )
     db.add(db_goal)
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
     return db_goal
 
 
 @router.put("/{goal_id}", response_model=schemas.Goal)
-def update_goal(
+async def update_goal(
     goal_id: int,
     goal: schemas.GoalUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza uma meta do usuário"""
-    db_goal = db.query(models.Goal).filter(
+    db_goal = (await db.scalars(select(models.Goal).where(
         models.Goal.id == goal_id,
         models.Goal.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_goal:
         raise HTTPException(status_code=404, detail="Goal not found")
@@ -74,26 +75,26 @@ def update_goal(
     for key, value in update_data.items():
         setattr(db_goal, key, value)
     
-    db.commit()
-    db.refresh(db_goal)
+    await db.commit()
+    await db.refresh(db_goal)
     return db_goal
 
 
 @router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_goal(
+async def delete_goal(
     goal_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta uma meta do usuário"""
-    db_goal = db.query(models.Goal).filter(
+    db_goal = (await db.scalars(select(models.Goal).where(
         models.Goal.id == goal_id,
         models.Goal.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    db.delete(db_goal)
-    db.commit()
+    await db.delete(db_goal)
+    await db.commit()
     return None
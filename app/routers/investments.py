@@ -1,36 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app import models, schemas
-from app.auth import get_current_active_user
+from app.auth import Principal, get_current_active_user
 
 router = APIRouter(prefix="/investments", tags=["investments"])
 
 
 @router.get("/", response_model=List[schemas.Investment])
-def get_investments(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+async def get_investments(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna todos os investimentos do usuário autenticado"""
-    investments = db.query(models.Investment).filter(
+    investments = (await db.scalars(select(models.Investment).where(
         models.Investment.user_id == current_user.id
-    ).all()
+    ))).all()
     return investments
 
 
 @router.get("/{investment_id}", response_model=schemas.Investment)
-def get_investment(
+async def get_investment(
     investment_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna um investimento específico do usuário"""
-    investment = db.query(models.Investment).filter(
+    investment = (await db.scalars(select(models.Investment).where(
         models.Investment.id == investment_id,
         models.Investment.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not investment:
         raise HTTPException(status_code=404, detail="Investment not found")
@@ -38,10 +39,10 @@ def get_investment(
 
 
 @router.post("/", response_model=schemas.Investment, status_code=status.HTTP_201_CREATED)
-def create_investment(
+async def create_investment(
     investment: schemas.InvestmentCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria um novo investimento para o usuário autenticado"""
     db_investment = models.Investment(
@@ -49,23 +50,23 @@ def create_investment(
         user_id=current_user.id
     )
     db.add(db_investment)
-    db.commit()
-    db.refresh(db_investment)
+    await db.commit()
+    await db.refresh(db_investment)
     return db_investment
 
 
 @router.put("/{investment_id}", response_model=schemas.Investment)
-def update_investment(
+async def update_investment(
     investment_id: int,
     investment: schemas.InvestmentUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza um investimento do usuário"""
-    db_investment = db.query(models.Investment).filter(
+    db_investment = (await db.scalars(select(models.Investment).where(
         models.Investment.id == investment_id,
         models.Investment.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_investment:
         raise HTTPException(status_code=404, detail="Investment not found")
@@ -74,26 +75,26 @@ def update_investment(
     for key, value in update_data.items():
         setattr(db_investment, key, value)
     
-    db.commit()
-    db.refresh(db_investment)
+    await db.commit()
+    await db.refresh(db_investment)
     return db_investment
 
 
 @router.delete("/{investment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_investment(
+async def delete_investment(
     investment_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta um investimento do usuário"""
-    db_investment = db.query(models.Investment).filter(
+    db_investment = (await db.scalars(select(models.Investment).where(
         models.Investment.id == investment_id,
         models.Investment.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_investment:
         raise HTTPException(status_code=404, detail="Investment not found")
     
-    db.delete(db_investment)
-    db.commit()
+    await db.delete(db_investment)
+    await db.commit()
     return None
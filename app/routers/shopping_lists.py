@@ -1,49 +1,183 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Literal
 from datetime import datetime
 from app import models, schemas
-from app.database import get_db
-from app.auth import get_current_active_user
+from app.database import get_async_db
+from app.auth import Principal, get_current_active_user
+from app.query_inspection import query_budget
+from app.autocomplete import invalidate_suggestions, record_items, suggest
+from app.forecast import invalidate_forecast
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.prices import PriceHistoryDeltas, get_price_stats, purchased_price
+from app.serialization import (
+    SHOPPING_ITEM_COLUMNS,
+    SHOPPING_LIST_COLUMNS,
+    as_dicts,
+    json_response,
+    shopping_lists_adapter,
+)
+from app.shopping import create_completion_transactions, duplicate_lists, recompute_totals
 
 router = APIRouter(prefix="/shopping-lists", tags=["shopping-lists"])
 
 
+def _list_with_items(*criteria):
+    """
+    Lista(s) com os itens em uma consulta extra (selectinload): a AsyncSession não
+    faz lazy load. populate_existing relê as colunas que os UPDATEs em lote
+    mudaram no banco (a sessão não expira os objetos no commit).
+    """
+    return (
+        select(models.ShoppingList)
+        .options(selectinload(models.ShoppingList.items))
+        .where(*criteria)
+        .execution_options(populate_existing=True)
+    )
+
+
+def _locked_list(list_id: int, user_id: int):
+    """Lista do usuário com lock até o commit (edições paralelas ficam em fila)"""
+    return select(models.ShoppingList).where(
+        models.ShoppingList.id == list_id,
+        models.ShoppingList.user_id == user_id
+    ).with_for_update()
+
+
 @router.get("/", response_model=List[schemas.ShoppingList])
-def get_shopping_lists(
+@query_budget(2)
+async def get_shopping_lists(
     skip: int = 0,
     limit: int = 100,
     status: str = None,
     month: str = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna todas as listas de compras do usuário com filtros opcionais"""
-    query = db.query(models.ShoppingList).filter(
+    stmt = select(*SHOPPING_LIST_COLUMNS).where(
         models.ShoppingList.user_id == current_user.id
     )
     
     if status:
-        query = query.filter(models.ShoppingList.status == status)
+        stmt = stmt.where(models.ShoppingList.status == status)
     
     if month:
-        query = query.filter(models.ShoppingList.month == month)
+        stmt = stmt.where(models.ShoppingList.month == month)
+    
+    stmt = stmt.order_by(models.ShoppingList.created_at.desc()).offset(skip).limit(limit)
+    lists = as_dicts(await db.execute(stmt), SHOPPING_LIST_COLUMNS)
+    
+    # Itens de todas as listas da página em uma única consulta
+    items_by_list = {shopping_list["id"]: [] for shopping_list in lists}
+    if items_by_list:
+        items = await db.execute(
+            select(*SHOPPING_ITEM_COLUMNS)
+            .where(models.ShoppingItem.shopping_list_id.in_(items_by_list))
+            .order_by(models.ShoppingItem.order, models.ShoppingItem.id)
+        )
+        for item in as_dicts(items, SHOPPING_ITEM_COLUMNS):
+            items_by_list[item["shopping_list_id"]].append(item)
+    
+    for shopping_list in lists:
+        shopping_list["items"] = items_by_list[shopping_list["id"]]
     
-    lists = query.order_by(models.ShoppingList.created_at.desc()).offset(skip).limit(limit).all()
-    return lists
+    return json_response(shopping_lists_adapter, lists)
+
+
+@router.get("/summary", response_model=List[schemas.ShoppingListSummary])
+@query_budget(1)
+async def get_shopping_list_summaries(
+    skip: int = 0,
+    limit: int = 100,
+    status: str = None,
+    month: str = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Retorna só os cabeçalhos das listas, com a contagem de itens calculada no banco"""
+    # Subconsultas correlacionadas: contam só as listas da página (índice por lista)
+    item_count = (
+        select(func.count(models.ShoppingItem.id))
+        .where(models.ShoppingItem.shopping_list_id == models.ShoppingList.id)
+        .scalar_subquery()
+    )
+    purchased_count = (
+        select(func.coalesce(func.sum(case((models.ShoppingItem.is_purchased, 1), else_=0)), 0))
+        .where(models.ShoppingItem.shopping_list_id == models.ShoppingList.id)
+        .scalar_subquery()
+    )
+    stmt = select(
+        *SHOPPING_LIST_COLUMNS,
+        item_count.label("item_count"),
+        purchased_count.label("purchased_count"),
+    ).where(models.ShoppingList.user_id == current_user.id)
+    
+    if status:
+        stmt = stmt.where(models.ShoppingList.status == status)
+    
+    if month:
+        stmt = stmt.where(models.ShoppingList.month == month)
+    
+    stmt = stmt.order_by(models.ShoppingList.created_at.desc()).offset(skip).limit(limit)
+    return [dict(row) for row in (await db.execute(stmt)).mappings()]
+
+
+@router.get("/autocomplete", response_model=List[schemas.ItemSuggestion])
+@query_budget(2)
+async def autocomplete_items(
+    q: str = Query(..., min_length=1, max_length=255),
+    field: Literal["name", "category"] = "name",
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Sugere nomes ou categorias já usados pelo usuário que começam com `q`, dos mais frequentes"""
+    return [
+        {"value": value, "count": count}
+        for value, count in await db.run_sync(suggest, current_user.id, field, q, limit)
+    ]
+
+
+@router.get("/prices/estimate", response_model=schemas.ItemPriceEstimate)
+@query_budget(1)
+async def estimate_item_price(
+    name: str = Query(..., min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Sugere o estimated_price de um item novo a partir dos preços já pagos por ele"""
+    stats = await db.run_sync(get_price_stats, current_user.id, name)
+    
+    if not stats:
+        return {"name": name, "estimated_price": None, "count": 0}
+    
+    return {
+        "name": stats.name,
+        "estimated_price": stats.last_price,
+        "last_price": stats.last_price,
+        "mean_price": round(stats.total / stats.count, 2),
+        "min_price": stats.min_price,
+        "max_price": stats.max_price,
+        "count": stats.count,
+        "updated_at": stats.updated_at,
+    }
 
 
 @router.get("/{list_id}", response_model=schemas.ShoppingList)
-def get_shopping_list(
+@query_budget(2)
+async def get_shopping_list(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna uma lista de compras específica"""
-    shopping_list = db.query(models.ShoppingList).filter(
+    shopping_list = (await db.scalars(_list_with_items(
         models.ShoppingList.id == list_id,
         models.ShoppingList.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
@@ -52,10 +186,11 @@ def get_shopping_list(
 
 
 @router.post("/", response_model=schemas.ShoppingList, status_code=status.HTTP_201_CREATED)
-def create_shopping_list(
+@query_budget(6)
+async def create_shopping_list(
     shopping_list: schemas.ShoppingListCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria uma nova lista de compras"""
     print(f"📥 Recebendo lista: name={shopping_list.name}, month={shopping_list.month}, status={shopping_list.status}")
@@ -66,310 +201,393 @@ def create_shopping_list(
         name=shopping_list.name,
         month=shopping_list.month,
         status=models.ShoppingListStatus(shopping_list.status) if shopping_list.status else models.ShoppingListStatus.active,
-        total_estimated=shopping_list.total_estimated,
-        total_spent=shopping_list.total_spent
+        total_estimated=0.0,
+        total_spent=0.0
     )
     
     print(f"💾 Salvando no DB: name={db_list.name}, month={db_list.month}, status={db_list.status}")
     db.add(db_list)
-    db.flush()  # Para obter o ID antes de adicionar itens
+    await db.flush()  # Para obter o ID antes de adicionar itens
     
     # Adicionar itens se fornecidos
     if shopping_list.items:
-        for item_data in shopping_list.items:
-            db_item = models.ShoppingItem(
-                shopping_list_id=db_list.id,
-                **item_data.model_dump()
-            )
-            db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_list)
-    return db_list
+        await db.execute(
+            insert(models.ShoppingItem),
+            [
+                dict(item.model_dump(), shopping_list_id=db_list.id,
+                     recorded_price=purchased_price(item.is_purchased, item.actual_price))
+                for item in shopping_list.items
+            ],
+            # Com os None no INSERT todas as linhas têm as mesmas colunas e vão em um
+            # único executemany (sem isso o ORM abre um lote a cada troca de colunas)
+            execution_options={"render_nulls": True}
+        )
+        prices = PriceHistoryDeltas()
+        for item in shopping_list.items:
+            prices.add(item.name, purchased_price(item.is_purchased, item.actual_price))
+        await db.run_sync(prices.apply, current_user.id)
+    
+    # Totais calculados a partir dos itens (os enviados pelo cliente são ignorados)
+    await db.run_sync(recompute_totals, [db_list.id])
+    await db.commit()
+    record_items(current_user.id, [(item.name, item.category) for item in shopping_list.items or []])
+    return (await db.scalars(_list_with_items(models.ShoppingList.id == db_list.id))).one()
 
 
 @router.put("/{list_id}", response_model=schemas.ShoppingList)
-def update_shopping_list(
+@query_budget(9)
+async def update_shopping_list(
     list_id: int,
     shopping_list: schemas.ShoppingListUpdate,
     create_transactions: bool = False,  # Novo parâmetro
     account_id: int = None,  # Conta para deduzir
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza uma lista de compras e opcionalmente cria transações"""
-    db_list = db.query(models.ShoppingList).filter(
-        models.ShoppingList.id == list_id,
-        models.ShoppingList.user_id == current_user.id
-    ).first()
+    # Lock na lista: uma conclusão repetida em paralelo espera e já encontra o status novo
+    db_list = (await db.scalars(_locked_list(list_id, current_user.id))).first()
     
     if not db_list:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
     
-    update_data = shopping_list.model_dump(exclude_unset=True)
+    # Totais são derivados dos itens; não aceitar valores do cliente
+    update_data = shopping_list.model_dump(exclude_unset=True, exclude={"total_estimated", "total_spent"})
     
     # Se mudar para completed, salvar timestamp e criar transações se solicitado
     if update_data.get("status") == "completed" and db_list.status != "completed":
         update_data["completed_at"] = datetime.utcnow()
         
-        # Criar transações se solicitado
-        if create_transactions and db_list.total_spent > 0:
-            # Agrupar itens comprados por categoria
-            items_by_category = {}
-            for item in db_list.items:
-                if item.is_purchased:
-                    category = item.category
-                    actual_price = item.actual_price if item.actual_price else item.estimated_price
-                    
-                    if category not in items_by_category:
-                        items_by_category[category] = {
-                            "total": 0,
-                            "items": []
-                        }
-                    
-                    items_by_category[category]["total"] += actual_price
-                    items_by_category[category]["items"].append(item.name)
-            
-            # Criar uma transação para cada categoria
-            transaction_date = update_data.get("completed_at") or datetime.utcnow()
-            
-            for category, data in items_by_category.items():
-                # Criar descrição com os itens
-                items_list = ", ".join(data["items"][:5])  # Primeiros 5 itens
-                if len(data["items"]) > 5:
-                    items_list += f" (+{len(data['items']) - 5} mais)"
-                
-                description = f"Compras - {db_list.name}: {items_list}"
-                
-                # Criar transação
-                transaction = models.Transaction(
-                    user_id=current_user.id,
-                    account_id=account_id,  # Pode ser None
-                    description=description,
-                    amount=data["total"],
-                    type=models.TransactionType.expense,
-                    category=category,
-                    date=transaction_date
-                )
-                db.add(transaction)
-                
-                # Atualizar saldo da conta se fornecida
-                if account_id:
-                    account = db.query(models.Account).filter(
-                        models.Account.id == account_id,
-                        models.Account.user_id == current_user.id
-                    ).first()
-                    
-                    if account:
-                        account.balance -= data["total"]
+        # Criar transações se solicitado (sem itens comprados, nada é criado)
+        if create_transactions:
+            await db.run_sync(
+                create_completion_transactions,
+                current_user.id, db_list, account_id, update_data["completed_at"].date()
+            )
     
     for key, value in update_data.items():
         setattr(db_list, key, value)
     
-    db.commit()
-    db.refresh(db_list)
-    return db_list
+    await db.commit()
+    invalidate_forecast(current_user.id)
+    return (await db.scalars(_list_with_items(models.ShoppingList.id == list_id))).one()
 
 
 @router.delete("/{list_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_shopping_list(
+@query_budget(4)
+async def delete_shopping_list(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta uma lista de compras"""
-    db_list = db.query(models.ShoppingList).filter(
+    db_list = (await db.scalars(select(models.ShoppingList).where(
         models.ShoppingList.id == list_id,
         models.ShoppingList.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not db_list:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
     
-    db.delete(db_list)
-    db.commit()
+    # Assíncrono: o cascade carrega os itens antes de excluí-los
+    await db.delete(db_list)
+    await db.commit()
+    invalidate_suggestions(current_user.id)
     return None
 
 
 # ==================== ROTAS DE ITENS ====================
 
+@router.get("/{list_id}/items", response_model=List[schemas.ShoppingItem])
+@query_budget(2)
+async def get_shopping_items(
+    list_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Retorna os itens de uma lista paginados, na ordem de exibição (para listas grandes)"""
+    list_exists = (await db.execute(
+        select(models.ShoppingList.id).where(
+            models.ShoppingList.id == list_id,
+            models.ShoppingList.user_id == current_user.id
+        )
+    )).first()
+    
+    if not list_exists:
+        raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
+    
+    items = await db.execute(
+        select(*SHOPPING_ITEM_COLUMNS)
+        .where(models.ShoppingItem.shopping_list_id == list_id)
+        .order_by(models.ShoppingItem.order, models.ShoppingItem.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return as_dicts(items, SHOPPING_ITEM_COLUMNS)
+
+
 @router.post("/{list_id}/items", response_model=schemas.ShoppingItem, status_code=status.HTTP_201_CREATED)
-def create_shopping_item(
+@query_budget(5)
+async def create_shopping_item(
     list_id: int,
     item: schemas.ShoppingItemCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Adiciona um item à lista de compras"""
-    # Verificar se a lista existe e pertence ao usuário
-    shopping_list = db.query(models.ShoppingList).filter(
-        models.ShoppingList.id == list_id,
-        models.ShoppingList.user_id == current_user.id
-    ).first()
+    # Verificar se a lista existe e pertence ao usuário (com lock até o commit)
+    shopping_list = (await db.scalars(_locked_list(list_id, current_user.id))).first()
     
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
     
     db_item = models.ShoppingItem(
         shopping_list_id=list_id,
+        recorded_price=purchased_price(item.is_purchased, item.actual_price),
         **item.model_dump()
     )
     db.add(db_item)
+    await db.flush()
     
-    # Atualizar total estimado da lista
-    shopping_list.total_estimated += item.estimated_price
+    prices = PriceHistoryDeltas()
+    prices.add(item.name, purchased_price(item.is_purchased, item.actual_price))
+    await db.run_sync(prices.apply, current_user.id)
     
-    db.commit()
-    db.refresh(db_item)
+    await db.run_sync(recompute_totals, [list_id])
+    await db.commit()
+    record_items(current_user.id, [(item.name, item.category)])
+    await db.refresh(db_item)
     return db_item
 
 
 @router.put("/{list_id}/items/{item_id}", response_model=schemas.ShoppingItem)
-def update_shopping_item(
+@query_budget(6)
+async def update_shopping_item(
     list_id: int,
     item_id: int,
     item: schemas.ShoppingItemUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza um item da lista de compras"""
-    # Verificar se a lista existe e pertence ao usuário
-    shopping_list = db.query(models.ShoppingList).filter(
-        models.ShoppingList.id == list_id,
-        models.ShoppingList.user_id == current_user.id
-    ).first()
+    # Verificar se a lista existe e pertence ao usuário (com lock até o commit)
+    shopping_list = (await db.scalars(_locked_list(list_id, current_user.id))).first()
     
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
     
-    db_item = db.query(models.ShoppingItem).filter(
+    db_item = (await db.scalars(select(models.ShoppingItem).where(
         models.ShoppingItem.id == item_id,
         models.ShoppingItem.shopping_list_id == list_id
-    ).first()
+    ))).first()
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Item não encontrado")
     
     update_data = item.model_dump(exclude_unset=True)
+    old_name = db_item.name
     
-    # Guardar estados anteriores
-    old_estimated = db_item.estimated_price
-    old_actual = db_item.actual_price or 0
-    old_is_purchased = db_item.is_purchased
-    
-    # Aplicar updates
     for key, value in update_data.items():
         setattr(db_item, key, value)
     
-    # Recalcular totais
-    new_estimated = db_item.estimated_price
-    new_actual = db_item.actual_price or 0
-    new_is_purchased = db_item.is_purchased
-    
-    # Atualizar total_estimated
-    shopping_list.total_estimated += (new_estimated - old_estimated)
-    
-    # Atualizar total_spent baseado em mudanças de is_purchased e actual_price
-    if new_is_purchased and not old_is_purchased:
-        # Item foi marcado como comprado
-        shopping_list.total_spent += new_actual
-    elif not new_is_purchased and old_is_purchased:
-        # Item foi desmarcado como comprado
-        shopping_list.total_spent -= old_actual
-    elif new_is_purchased and old_is_purchased:
-        # Item já estava comprado, mas actual_price mudou
-        shopping_list.total_spent += (new_actual - old_actual)
-    
-    db.commit()
-    db.refresh(db_item)
-    db.refresh(shopping_list)
+    # Histórico de preços: registra a compra com preço real ou corrige o preço já registrado
+    prices = PriceHistoryDeltas()
+    db_item.recorded_price = prices.add_transition(
+        old_name, db_item.recorded_price, db_item.name, db_item.is_purchased, db_item.actual_price
+    )
+    await db.flush()
+    await db.run_sync(prices.apply, current_user.id)
+    
+    await db.run_sync(recompute_totals, [list_id])
+    await db.commit()
+    if "name" in update_data or "category" in update_data:
+        invalidate_suggestions(current_user.id)
+    await db.refresh(db_item)
     return db_item
 
 
 @router.delete("/{list_id}/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_shopping_item(
+@query_budget(4)
+async def delete_shopping_item(
     list_id: int,
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta um item da lista de compras"""
-    # Verificar se a lista existe e pertence ao usuário
-    shopping_list = db.query(models.ShoppingList).filter(
-        models.ShoppingList.id == list_id,
-        models.ShoppingList.user_id == current_user.id
-    ).first()
+    # Verificar se a lista existe e pertence ao usuário (com lock até o commit)
+    shopping_list = (await db.scalars(_locked_list(list_id, current_user.id))).first()
     
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
     
-    db_item = db.query(models.ShoppingItem).filter(
+    db_item = (await db.scalars(select(models.ShoppingItem).where(
         models.ShoppingItem.id == item_id,
         models.ShoppingItem.shopping_list_id == list_id
-    ).first()
+    ))).first()
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Item não encontrado")
     
-    # Atualizar totais da lista
-    shopping_list.total_estimated -= db_item.estimated_price
-    shopping_list.total_spent -= (db_item.actual_price or 0)
+    await db.delete(db_item)
+    await db.flush()
     
-    db.delete(db_item)
-    db.commit()
+    await db.run_sync(recompute_totals, [list_id])
+    await db.commit()
+    invalidate_suggestions(current_user.id)
     return None
 
 
+# Colunas gravadas pelo UPDATE em lote, iguais para todas as linhas
+BATCH_UPDATE_COLUMNS = tuple(schemas.ShoppingItemUpdate.model_fields)
+
+
+@router.post("/{list_id}/items/batch", response_model=schemas.ShoppingList)
+@query_budget(10)
+async def batch_shopping_items(
+    list_id: int,
+    batch: schemas.ShoppingItemBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Aplica marcações, edições, reordenação, exclusões e inclusões de itens em uma única transação do banco.
+    Os totais da lista são recalculados uma única vez, no final.
+    """
+    # Travar a lista: lotes paralelos na mesma lista são aplicados um depois do outro
+    shopping_list = (await db.execute(
+        select(models.ShoppingList.id).where(
+            models.ShoppingList.id == list_id,
+            models.ShoppingList.user_id == current_user.id
+        ).with_for_update()
+    )).first()
+    
+    if not shopping_list:
+        raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
+    
+    delete_ids = list(dict.fromkeys(batch.delete))
+    
+    # Validar de uma vez que todos os itens alterados ou removidos são desta lista
+    # (trazendo o estado atual, para completar as edições e para o histórico de preços)
+    target_ids = {item.id for item in batch.update} | set(delete_ids)
+    found = {}
+    if target_ids:
+        found = {
+            row.id: row for row in await db.execute(
+                select(
+                    models.ShoppingItem.id,
+                    models.ShoppingItem.recorded_price,
+                    *(getattr(models.ShoppingItem, column) for column in BATCH_UPDATE_COLUMNS)
+                ).where(
+                    models.ShoppingItem.id.in_(target_ids),
+                    models.ShoppingItem.shopping_list_id == list_id
+                )
+            )
+        }
+        if len(found) != len(target_ids):
+            raise HTTPException(status_code=404, detail="Item não encontrado")
+    
+    # Cada edição é completada com os valores atuais do item: todas as linhas têm
+    # as mesmas colunas e o UPDATE por chave primária é um único executemany
+    # (edições repetidas do mesmo item se acumulam em `state`, na ordem do lote)
+    updates = [
+        item.model_dump(exclude_unset=True)
+        for item in batch.update
+        if item.id not in delete_ids
+    ]
+    updates = [data for data in updates if len(data) > 1]
+    
+    prices = PriceHistoryDeltas()
+    state = {item_id: row._asdict() for item_id, row in found.items()}
+    rows = {}
+    for data in updates:
+        old_state = state[data["id"]]
+        new_state = dict(old_state, **data)
+        new_state["recorded_price"] = prices.add_transition(
+            old_state["name"], old_state["recorded_price"], new_state["name"],
+            new_state["is_purchased"], new_state["actual_price"]
+        )
+        state[data["id"]] = rows[data["id"]] = new_state
+    if rows:
+        await db.execute(update(models.ShoppingItem), list(rows.values()))
+    
+    for item in batch.create:
+        prices.add(item.name, purchased_price(item.is_purchased, item.actual_price))
+    await db.run_sync(prices.apply, current_user.id)
+    
+    if delete_ids:
+        await db.execute(
+            delete(models.ShoppingItem).where(models.ShoppingItem.id.in_(delete_ids)),
+            execution_options={"synchronize_session": False}
+        )
+    
+    if batch.create:
+        await db.execute(
+            insert(models.ShoppingItem),
+            [
+                dict(item.model_dump(), shopping_list_id=list_id,
+                     recorded_price=purchased_price(item.is_purchased, item.actual_price))
+                for item in batch.create
+            ],
+            execution_options={"render_nulls": True}
+        )
+    
+    await db.run_sync(recompute_totals, [list_id])
+    await db.commit()
+    
+    if delete_ids or any("name" in data or "category" in data for data in updates):
+        invalidate_suggestions(current_user.id)
+    else:
+        record_items(current_user.id, [(item.name, item.category) for item in batch.create])
+    
+    return (await db.scalars(_list_with_items(models.ShoppingList.id == list_id))).one()
+
+
+@router.post("/duplicate", response_model=List[schemas.ShoppingList], status_code=status.HTTP_201_CREATED)
+@query_budget(5)
+async def duplicate_shopping_lists(
+    copies: List[schemas.ShoppingListDuplicate],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Duplica várias listas de uma vez (ex.: gerar o próximo mês a partir de listas modelo)"""
+    new_ids = await db.run_sync(
+        duplicate_lists, current_user.id, [(copy.list_id, copy.new_name, copy.new_month) for copy in copies]
+    )
+    
+    if None in new_ids:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
+    
+    await db.commit()
+    invalidate_suggestions(current_user.id)
+    
+    loaded = {
+        shopping_list.id: shopping_list
+        for shopping_list in await db.scalars(_list_with_items(models.ShoppingList.id.in_(new_ids)))
+    }
+    return [loaded[new_id] for new_id in new_ids]
+
+
 @router.post("/{list_id}/duplicate", response_model=schemas.ShoppingList, status_code=status.HTTP_201_CREATED)
-def duplicate_shopping_list(
+@query_budget(5)
+async def duplicate_shopping_list(
     list_id: int,
     new_name: str,
     new_month: str = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Duplica uma lista de compras existente (para reutilizar itens)"""
-    # Buscar lista original
-    original_list = db.query(models.ShoppingList).filter(
-        models.ShoppingList.id == list_id,
-        models.ShoppingList.user_id == current_user.id
-    ).first()
+    # Lista e itens copiados no banco, sem carregar os itens da original
+    new_id, = await db.run_sync(duplicate_lists, current_user.id, [(list_id, new_name, new_month)])
     
-    if not original_list:
+    if new_id is None:
         raise HTTPException(status_code=404, detail="Lista de compras não encontrada")
     
-    # Criar nova lista
-    new_list = models.ShoppingList(
-        user_id=current_user.id,
-        name=new_name,
-        month=new_month,
-        status="active",
-        total_estimated=0.0,
-        total_spent=0.0
-    )
-    db.add(new_list)
-    db.flush()
-    
-    # Copiar itens (resetando preços reais e status de compra)
-    total_estimated = 0.0
-    for original_item in original_list.items:
-        new_item = models.ShoppingItem(
-            shopping_list_id=new_list.id,
-            name=original_item.name,
-            category=original_item.category,
-            quantity=original_item.quantity,
-            estimated_price=original_item.estimated_price,
-            actual_price=None,
-            is_purchased=False,
-            notes=original_item.notes,
-            order=original_item.order
-        )
-        db.add(new_item)
-        total_estimated += original_item.estimated_price
+    await db.commit()
+    invalidate_suggestions(current_user.id)
     
-    new_list.total_estimated = total_estimated
-    
-    db.commit()
-    db.refresh(new_list)
-    return new_list
-
+    return (await db.scalars(_list_with_items(models.ShoppingList.id == new_id))).one()
@@ -1,179 +1,505 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from datetime import date
+from itertools import islice
+from app.database import get_async_db, get_db
 from app import models, schemas
-from app.auth import get_current_active_user
+from app.auth import Principal, get_current_active_user
+from app.query_inspection import query_budget
+from app.exports import EXPORT_COLUMNS, EXPORT_MEDIA_TYPES, ExportFormat, stream_transactions
+from app.imports import IMPORT_CHUNK_SIZE, ImportFormat, StatementParseError, iter_statement_rows
+from app.balances import BalanceDeltas, adjust_balance, balance_effect
+from app.forecast import invalidate_forecast
+from app.rollups import SummaryDeltas
+from app.search import search_transactions
+from app.serialization import TRANSACTION_COLUMNS, as_dicts, json_response, transactions_adapter
+from app.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
+def _apply_filters(query, date_from, date_to, type, category, account_id):
+    """Aplica os filtros opcionais de listagem (serve para Query e select)"""
+    if date_from:
+        query = query.filter(models.Transaction.date >= date_from)
+    
+    if date_to:
+        query = query.filter(models.Transaction.date <= date_to)
+    
+    if type:
+        query = query.filter(models.Transaction.type == type)
+    
+    if category:
+        query = query.filter(models.Transaction.category == category)
+    
+    if account_id:
+        query = query.filter(models.Transaction.account_id == account_id)
+    
+    return query
+
+
 @router.get("/", response_model=List[schemas.Transaction])
-def get_transactions(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+@query_budget(1)
+async def get_transactions(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    account_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Retorna todas as transações do usuário autenticado"""
-    transactions = db.query(models.Transaction).filter(
+    """
+    Retorna as transações do usuário autenticado, das mais recentes para as mais antigas.
+    Paginação por cursor: quando houver mais resultados, o cabeçalho X-Next-Cursor
+    traz o valor a ser enviado em `cursor` para buscar a próxima página.
+    """
+    stmt = select(*TRANSACTION_COLUMNS).where(
         models.Transaction.user_id == current_user.id
-    ).all()
+    )
+    stmt = _apply_filters(stmt, date_from, date_to, type, category, account_id)
+    
+    # Keyset: continua estritamente depois da última chave (date, id) já entregue
+    position = decode_cursor(cursor)
+    if position:
+        stmt = stmt.where(
+            tuple_(models.Transaction.date, models.Transaction.id) < tuple_(*position)
+        )
+    
+    # Busca um registro a mais para saber se existe próxima página
+    rows = as_dicts(await db.execute(
+        stmt.order_by(
+            models.Transaction.date.desc(),
+            models.Transaction.id.desc()
+        ).limit(limit + 1)
+    ), TRANSACTION_COLUMNS)
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last["date"], last["id"])
+    
+    return json_response(transactions_adapter, rows, headers)
+
+
+@router.get("/export")
+def export_transactions(
+    format: ExportFormat = ExportFormat.csv,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    account_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Exporta as transações do usuário em CSV ou NDJSON.
+    As linhas são lidas com cursor no servidor e enviadas em streaming,
+    então o uso de memória não cresce com o número de transações.
+    """
+    stmt = select(*EXPORT_COLUMNS).where(
+        models.Transaction.user_id == current_user.id
+    )
+    stmt = _apply_filters(stmt, date_from, date_to, type, category, account_id)
+    stmt = stmt.order_by(models.Transaction.date, models.Transaction.id)
     
-    # Converter date para string para evitar erro de serialização
-    for t in transactions:
-        if hasattr(t.date, 'isoformat'):
-            t.date = t.date.isoformat()
+    filename = f"transactions.{format.value}"
+    return StreamingResponse(
+        stream_transactions(stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/search", response_model=List[schemas.Transaction])
+@query_budget(1)
+async def search_transactions_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Busca transações por descrição e categoria, ordenadas por relevância"""
+    rows = await db.run_sync(search_transactions, current_user.id, q, limit, offset)
+    return json_response(transactions_adapter, as_dicts(rows, TRANSACTION_COLUMNS))
+
+
+@router.get("/summary", response_model=List[schemas.MonthlySummary])
+@query_budget(1)
+async def get_transactions_summary(
+    month_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    month_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Receitas, despesas e saldo por mês, com a abertura por categoria.
+    Lido da tabela de resumo mensal, sem percorrer as transações.
+    """
+    stmt = select(models.MonthlyCategorySummary).where(
+        models.MonthlyCategorySummary.user_id == current_user.id,
+        models.MonthlyCategorySummary.count > 0
+    )
+    
+    if month_from:
+        stmt = stmt.where(models.MonthlyCategorySummary.month >= month_from)
     
-    return transactions
+    if month_to:
+        stmt = stmt.where(models.MonthlyCategorySummary.month <= month_to)
+    
+    months = {}
+    rows = await db.scalars(
+        stmt.order_by(models.MonthlyCategorySummary.month, models.MonthlyCategorySummary.category)
+    )
+    for row in rows:
+        month = months.setdefault(row.month, {"month": row.month, "income": 0.0, "expense": 0.0, "categories": []})
+        month[row.type.value] += row.total
+        month["categories"].append({
+            "category": row.category,
+            "type": row.type.value,
+            "total": row.total,
+            "count": row.count,
+        })
+    
+    for month in months.values():
+        month["net"] = month["income"] - month["expense"]
+    
+    return list(months.values())
 
 
 @router.get("/{transaction_id}", response_model=schemas.Transaction)
-def get_transaction(
+@query_budget(1)
+async def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Retorna uma transação específica do usuário"""
-    transaction = db.query(models.Transaction).filter(
+    transaction = (await db.scalars(select(models.Transaction).where(
         models.Transaction.id == transaction_id,
         models.Transaction.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    # Converter date para string
-    if hasattr(transaction.date, 'isoformat'):
-        transaction.date = transaction.date.isoformat()
-    
     return transaction
 
 
 @router.post("/", response_model=schemas.Transaction, status_code=status.HTTP_201_CREATED)
-def create_transaction(
+@query_budget(4)
+async def create_transaction(
     transaction: schemas.TransactionCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Cria uma nova transação para o usuário autenticado"""
     db_transaction = models.Transaction(
-        **transaction.model_dump(),
+        **_normalize_fields(transaction.model_dump()),
         user_id=current_user.id
     )
     db.add(db_transaction)
     
-    # Atualizar saldo da conta se account_id foi fornecido
-    if transaction.account_id:
-        account = db.query(models.Account).filter(
-            models.Account.id == transaction.account_id,
-            models.Account.user_id == current_user.id
-        ).first()
-        
-        if account:
-            if transaction.type == "income":
-                account.balance += transaction.amount
-            else:  # expense
-                account.balance -= transaction.amount
+    summary = SummaryDeltas()
+    summary.add_transaction(db_transaction)
+    await db.run_sync(summary.apply, current_user.id)
     
-    db.commit()
-    db.refresh(db_transaction)
+    # Atualizar saldo da conta se account_id foi fornecido
+    await db.run_sync(
+        adjust_balance, current_user.id, db_transaction.account_id,
+        balance_effect(db_transaction.type, db_transaction.amount)
+    )
     
-    # Converter date para string
-    if hasattr(db_transaction.date, 'isoformat'):
-        db_transaction.date = db_transaction.date.isoformat()
+    await db.commit()
+    invalidate_forecast(current_user.id)
+    await db.refresh(db_transaction)
     
     return db_transaction
 
 
 @router.put("/{transaction_id}", response_model=schemas.Transaction)
-def update_transaction(
+@query_budget(5)
+async def update_transaction(
     transaction_id: int,
     transaction: schemas.TransactionUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Atualiza uma transação do usuário"""
-    db_transaction = db.query(models.Transaction).filter(
+    # Lock da linha: edições concorrentes da mesma transação não revertem o saldo duas vezes
+    db_transaction = (await db.scalars(select(models.Transaction).where(
         models.Transaction.id == transaction_id,
         models.Transaction.user_id == current_user.id
-    ).first()
+    ).with_for_update())).first()
     
     if not db_transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    # Guardar valores antigos para reverter o saldo
-    old_account_id = db_transaction.account_id
-    old_amount = db_transaction.amount
-    old_type = db_transaction.type
+    summary = SummaryDeltas()
+    balances = BalanceDeltas()
     
-    # Reverter saldo da conta antiga se houver
-    if old_account_id:
-        old_account = db.query(models.Account).filter(
-            models.Account.id == old_account_id,
-            models.Account.user_id == current_user.id
-        ).first()
-        
-        if old_account:
-            if old_type == "income":
-                old_account.balance -= old_amount
-            else:  # expense
-                old_account.balance += old_amount
+    # Reverter os efeitos dos valores antigos
+    summary.remove_transaction(db_transaction)
+    balances.remove_transaction(db_transaction)
     
     # Atualizar a transação
-    update_data = transaction.model_dump(exclude_unset=True)
+    update_data = _normalize_fields(transaction.model_dump(exclude_unset=True))
     for key, value in update_data.items():
         setattr(db_transaction, key, value)
     
-    # Aplicar novo saldo na conta (pode ser a mesma ou diferente)
-    if db_transaction.account_id:
-        new_account = db.query(models.Account).filter(
-            models.Account.id == db_transaction.account_id,
-            models.Account.user_id == current_user.id
-        ).first()
-        
-        if new_account:
-            if db_transaction.type == "income":
-                new_account.balance += db_transaction.amount
-            else:  # expense
-                new_account.balance -= db_transaction.amount
+    # Aplicar os novos valores (a conta pode ser a mesma ou diferente)
+    summary.add_transaction(db_transaction)
+    balances.add_transaction(db_transaction)
+    await db.run_sync(summary.apply, current_user.id)
+    await db.run_sync(balances.apply, current_user.id)
     
-    db.commit()
-    db.refresh(db_transaction)
-    
-    # Converter date para string
-    if hasattr(db_transaction.date, 'isoformat'):
-        db_transaction.date = db_transaction.date.isoformat()
+    await db.commit()
+    invalidate_forecast(current_user.id)
+    await db.refresh(db_transaction)
     
     return db_transaction
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(
+@query_budget(4)
+async def delete_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Deleta uma transação do usuário"""
-    db_transaction = db.query(models.Transaction).filter(
+    db_transaction = (await db.scalars(select(models.Transaction).where(
         models.Transaction.id == transaction_id,
         models.Transaction.user_id == current_user.id
-    ).first()
+    ).with_for_update())).first()
     
     if not db_transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
     # Reverter saldo da conta antes de deletar
-    if db_transaction.account_id:
-        account = db.query(models.Account).filter(
-            models.Account.id == db_transaction.account_id,
-            models.Account.user_id == current_user.id
-        ).first()
-        
-        if account:
-            if db_transaction.type == "income":
-                account.balance -= db_transaction.amount
-            else:  # expense
-                account.balance += db_transaction.amount
-    
-    db.delete(db_transaction)
-    db.commit()
+    await db.run_sync(
+        adjust_balance, current_user.id, db_transaction.account_id,
+        -balance_effect(db_transaction.type, db_transaction.amount)
+    )
+    
+    summary = SummaryDeltas()
+    summary.remove_transaction(db_transaction)
+    await db.run_sync(summary.apply, current_user.id)
+    
+    await db.delete(db_transaction)
+    await db.commit()
+    invalidate_forecast(current_user.id)
     return None
+
+
+def _normalize_fields(data: dict) -> dict:
+    """Converte date/type recebidos como string para os tipos das colunas"""
+    try:
+        if data.get("date") is not None:
+            data["date"] = date.fromisoformat(data["date"])
+        if data.get("type") is not None:
+            data["type"] = models.TransactionType(data["type"])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return data
+
+
+@router.post("/batch", response_model=schemas.TransactionBatchResult)
+async def batch_transactions(
+    batch: schemas.TransactionBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Aplica criações, atualizações e exclusões de transações em uma única transação do banco.
+    Os saldos são reconciliados com um único UPDATE por conta afetada.
+    """
+    balances = BalanceDeltas()
+    summary = SummaryDeltas()
+    delete_ids = list(dict.fromkeys(batch.delete))
+    
+    # Carregar de uma vez todas as transações que serão alteradas ou removidas
+    target_ids = {item.id for item in batch.update} | set(delete_ids)
+    existing = {}
+    if target_ids:
+        existing = {
+            t.id: t for t in await db.scalars(
+                select(models.Transaction).where(
+                    models.Transaction.id.in_(target_ids),
+                    models.Transaction.user_id == current_user.id
+                ).order_by(models.Transaction.id).with_for_update()
+            )
+        }
+        if len(existing) != len(target_ids):
+            raise HTTPException(status_code=404, detail="Transaction not found")
+    
+    new_rows = [
+        dict(_normalize_fields(item.model_dump()), user_id=current_user.id)
+        for item in batch.create
+    ]
+    updates = [
+        (existing[item.id], _normalize_fields(item.model_dump(exclude_unset=True, exclude={"id"})))
+        for item in batch.update
+    ]
+    
+    # Validar as contas referenciadas com uma única consulta
+    account_ids = {row["account_id"] for row in new_rows if row["account_id"]}
+    account_ids |= {data["account_id"] for _, data in updates if data.get("account_id")}
+    if account_ids:
+        owned = await db.scalar(
+            select(func.count(models.Account.id)).where(
+                models.Account.id.in_(account_ids),
+                models.Account.user_id == current_user.id
+            )
+        )
+        if owned != len(account_ids):
+            raise HTTPException(status_code=404, detail="Account not found")
+    
+    for db_transaction, data in updates:
+        summary.remove_transaction(db_transaction)
+        balances.remove_transaction(db_transaction)
+        for key, value in data.items():
+            setattr(db_transaction, key, value)
+        summary.add_transaction(db_transaction)
+        balances.add_transaction(db_transaction)
+    
+    for transaction_id in delete_ids:
+        db_transaction = existing[transaction_id]
+        summary.remove_transaction(db_transaction)
+        balances.remove_transaction(db_transaction)
+    
+    created_ids = []
+    if new_rows:
+        created_ids = (await db.scalars(
+            insert(models.Transaction).returning(models.Transaction.id, sort_by_parameter_order=True),
+            new_rows
+        )).all()
+        for row in new_rows:
+            summary.add(row["date"], row["category"], row["type"], row["amount"])
+            balances.add(row["account_id"], row["type"], row["amount"])
+    
+    if delete_ids:
+        await db.execute(
+            delete(models.Transaction).where(models.Transaction.id.in_(delete_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        for transaction_id in delete_ids:
+            db.expunge(existing[transaction_id])
+    
+    await db.run_sync(balances.apply, current_user.id)
+    await db.run_sync(summary.apply, current_user.id)
+    
+    await db.commit()
+    invalidate_forecast(current_user.id)
+    
+    # Recarregar criadas e atualizadas em uma única consulta
+    updated_ids = list(dict.fromkeys(
+        item.id for item in batch.update if item.id not in delete_ids
+    ))
+    loaded = {}
+    if created_ids or updated_ids:
+        # populate_existing: a sessão não expira as atualizadas no commit
+        loaded = {
+            t.id: t for t in await db.scalars(
+                select(models.Transaction)
+                .where(models.Transaction.id.in_(list(created_ids) + updated_ids))
+                .execution_options(populate_existing=True)
+            )
+        }
+    
+    return {
+        "created": [loaded[i] for i in created_ids],
+        "updated": [loaded[i] for i in updated_ids if i in loaded],
+        "deleted": delete_ids,
+    }
+
+
+def _next_chunk(rows) -> list:
+    return list(islice(rows, IMPORT_CHUNK_SIZE))
+
+
+@router.post("/import", response_model=schemas.TransactionImportResult)
+async def import_transactions(
+    file: UploadFile = File(...),
+    format: ImportFormat = ImportFormat.csv,
+    account_id: Optional[int] = None,
+    default_category: str = "Outros",
+    date_column: str = "date",
+    description_column: str = "description",
+    amount_column: str = "amount",
+    category_column: str = "category",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Importa um extrato bancário (CSV ou OFX) em lotes.
+    Lançamentos já importados são ignorados e o saldo da conta é ajustado uma única vez no final.
+    A leitura do arquivo e o parse de cada lote rodam no threadpool, fora do event loop.
+    """
+    if account_id:
+        account = (await db.execute(select(models.Account.id).where(
+            models.Account.id == account_id,
+            models.Account.user_id == current_user.id
+        ))).first()
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+    
+    columns = {
+        "date": date_column,
+        "description": description_column,
+        "amount": amount_column,
+        "category": category_column,
+    }
+    rows = iter_statement_rows(file.file, format, current_user.id, account_id, default_category, columns)
+    
+    imported = 0
+    duplicates = 0
+    balances = BalanceDeltas()
+    summary = SummaryDeltas()
+    try:
+        while True:
+            chunk = await run_in_threadpool(_next_chunk, rows)
+            if not chunk:
+                break
+            
+            # Uma consulta por lote, usando o índice (user_id, import_hash)
+            already_imported = set(await db.scalars(
+                select(models.Transaction.import_hash).where(
+                    models.Transaction.user_id == current_user.id,
+                    models.Transaction.import_hash.in_([row["import_hash"] for row in chunk])
+                )
+            ))
+            new_rows = [row for row in chunk if row["import_hash"] not in already_imported]
+            duplicates += len(chunk) - len(new_rows)
+            
+            if new_rows:
+                await db.execute(insert(models.Transaction), new_rows)
+                imported += len(new_rows)
+                for row in new_rows:
+                    balances.add(account_id, row["type"], row["amount"])
+                    summary.add(row["date"], row["category"], row["type"], row["amount"])
+    except (StatementParseError, UnicodeDecodeError) as exc:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=str(exc))
+    
+    await db.run_sync(balances.apply, current_user.id)
+    await db.run_sync(summary.apply, current_user.id)
+    
+    await db.commit()
+    invalidate_forecast(current_user.id)
+    return {"imported": imported, "duplicates": duplicates}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, field_serializer, ConfigDict, model_serializer
+from pydantic import BaseModel, EmailStr, field_serializer, field_validator, ConfigDict, model_serializer
 from typing import Optional, List, Any, Dict
 from datetime import date, datetime
 
@@ -31,6 +31,12 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -125,6 +131,14 @@ class Transaction(TransactionBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator('date', mode='before')
+    @classmethod
+    def coerce_date(cls, value: Any) -> Any:
+        """Aceita o date vindo do ORM sem precisar alterar o objeto"""
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
     @model_serializer(mode='wrap')
     def serialize_model(self, serializer) -> Dict[str, Any]:
         """Serializa o modelo completo, convertendo date para string"""
@@ -139,6 +153,73 @@ class Transaction(TransactionBase):
         return data
 
 
+class TransactionBatchUpdate(TransactionUpdate):
+    id: int
+
+
+class TransactionBatch(BaseModel):
+    create: List[TransactionCreate] = []
+    update: List[TransactionBatchUpdate] = []
+    delete: List[int] = []
+
+
+class TransactionBatchResult(BaseModel):
+    created: List[Transaction] = []
+    updated: List[Transaction] = []
+    deleted: List[int] = []
+
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    duplicates: int
+
+
+class CategorySummary(BaseModel):
+    category: str
+    type: str
+    total: float
+    count: int
+
+
+class MonthlySummary(BaseModel):
+    month: str
+    income: float = 0.0
+    expense: float = 0.0
+    net: float = 0.0
+    categories: List[CategorySummary] = []
+
+
+class RecurringSeries(BaseModel):
+    account_id: Optional[int] = None
+    description: str
+    category: str
+    type: str
+    amount: float
+    period: str  # "weekly", "biweekly" ou "monthly"
+    occurrences: int
+    last_date: date
+    next_date: date
+
+
+class ForecastPoint(BaseModel):
+    date: date
+    balance: float
+
+
+class AccountForecast(BaseModel):
+    account_id: int
+    name: str
+    current_balance: float
+    points: List[ForecastPoint]
+
+
+class Forecast(BaseModel):
+    today: date
+    horizon_days: int
+    accounts: List[AccountForecast]
+    series: List[RecurringSeries]
+
+
 class InvestmentBase(BaseModel):
     name: str
     type: str
@@ -222,6 +303,16 @@ class ShoppingItemUpdate(BaseModel):
     order: Optional[int] = None
 
 
+class ShoppingItemBatchUpdate(ShoppingItemUpdate):
+    id: int
+
+
+class ShoppingItemBatch(BaseModel):
+    create: List[ShoppingItemCreate] = []
+    update: List[ShoppingItemBatchUpdate] = []
+    delete: List[int] = []
+
+
 class ShoppingItem(ShoppingItemBase):
     id: int
     shopping_list_id: int
@@ -263,6 +354,39 @@ class ShoppingList(ShoppingListBase):
         from_attributes = True
 
 
+class ShoppingListDuplicate(BaseModel):
+    list_id: int
+    new_name: str
+    new_month: Optional[str] = None
+
+
+class ShoppingListSummary(ShoppingListBase):
+    """Cabeçalho da lista sem os itens, com as contagens calculadas no banco"""
+    id: int
+    item_count: int
+    purchased_count: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+class ItemPriceEstimate(BaseModel):
+    """Preço sugerido (último pago) e estatísticas do histórico do item"""
+    name: str
+    estimated_price: Optional[float] = None
+    last_price: Optional[float] = None
+    mean_price: Optional[float] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    count: int = 0
+    updated_at: Optional[datetime] = None
+
+
+class ItemSuggestion(BaseModel):
+    value: str
+    count: int
+
+
 # ==================== CATEGORIES ====================
 
 class CategoryBase(BaseModel):
@@ -289,3 +413,51 @@ class Category(CategoryBase):
     class Config:
         from_attributes = True
 
+
+
+# ==================== DASHBOARD ====================
+
+class DashboardAccounts(BaseModel):
+    count: int
+    balance: float
+    investments: float
+
+
+class DashboardCreditCards(BaseModel):
+    count: int
+    used: int
+    limit: int
+    utilization: float
+
+
+class DashboardInvestments(BaseModel):
+    count: int
+    value: float
+
+
+class DashboardGoals(BaseModel):
+    count: int
+    current: float
+    target: float
+
+
+class DashboardMonthToDate(BaseModel):
+    month: str
+    income: float
+    expense: float
+    net: float
+
+
+class DashboardShoppingLists(BaseModel):
+    active: int
+    total_estimated: float
+
+
+class Dashboard(BaseModel):
+    net_worth: float
+    accounts: DashboardAccounts
+    credit_cards: DashboardCreditCards
+    investments: DashboardInvestments
+    goals: DashboardGoals
+    month_to_date: DashboardMonthToDate
+    shopping_lists: DashboardShoppingLists
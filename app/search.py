@@ -0,0 +1,71 @@
+"""
+Busca textual nas transações (descrição + categoria).
+
+PostgreSQL: full-text (tsvector, dicionário português) combinado com
+similaridade de trigramas (pg_trgm), ambos com índices GIN.
+SQLite (desenvolvimento/testes): tabela virtual FTS5 com tokenizer trigram,
+mantida por triggers. As DDLs dos índices estão em app/models.py e na migration.
+"""
+from sqlalchemy import Select, column, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.serialization import TRANSACTION_COLUMNS
+
+TS_CONFIG = literal_column("'portuguese'")
+
+# Mesma expressão dos índices, para que o planner consiga usá-los
+SEARCH_DOCUMENT = models.Transaction.description.op("||")(literal_column("' '")).op("||")(models.Transaction.category)
+
+TRANSACTIONS_FTS = table("transactions_fts", column("rowid"))
+
+# O tokenizer trigram do FTS5 não encontra termos com menos de 3 caracteres
+MIN_FTS_TERM_LENGTH = 3
+
+
+def _postgresql_search(user_id: int, q: str) -> Select:
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+    tsvector = func.to_tsvector(TS_CONFIG, SEARCH_DOCUMENT)
+    rank = func.ts_rank(tsvector, tsquery) + func.word_similarity(q, SEARCH_DOCUMENT)
+    return (
+        select(*TRANSACTION_COLUMNS)
+        .where(
+            models.Transaction.user_id == user_id,
+            or_(tsvector.op("@@")(tsquery), literal(q).op("<%")(SEARCH_DOCUMENT)),
+        )
+        .order_by(rank.desc(), models.Transaction.id.desc())
+    )
+
+
+def _fts_match_expression(q: str) -> str:
+    """Cada termo entre aspas (escapando aspas internas), combinados com OR"""
+    terms = [term.replace('"', '""') for term in q.split() if len(term) >= MIN_FTS_TERM_LENGTH]
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def _sqlite_search(user_id: int, q: str) -> Select:
+    match = _fts_match_expression(q)
+    stmt = select(*TRANSACTION_COLUMNS).where(models.Transaction.user_id == user_id)
+    if not match:
+        pattern = f"%{q}%"
+        return stmt.where(or_(
+            models.Transaction.description.ilike(pattern),
+            models.Transaction.category.ilike(pattern),
+        )).order_by(models.Transaction.date.desc(), models.Transaction.id.desc())
+
+    return (
+        stmt.join(TRANSACTIONS_FTS, TRANSACTIONS_FTS.c.rowid == models.Transaction.id)
+        .where(text("transactions_fts MATCH :match").bindparams(match=match))
+        # bm25: quanto menor, mais relevante
+        .order_by(text("bm25(transactions_fts)"), models.Transaction.id.desc())
+    )
+
+
+def search_transactions(db: Session, user_id: int, q: str, limit: int, offset: int):
+    """Retorna as linhas (colunas de TRANSACTION_COLUMNS) ordenadas por relevância"""
+    q = q.strip()
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = _postgresql_search(user_id, q)
+    else:
+        stmt = _sqlite_search(user_id, q)
+    return db.execute(stmt.limit(limit).offset(offset)).all()
@@ -0,0 +1,103 @@
+"""
+Caminho rápido de serialização para as listagens grandes.
+
+Em vez de carregar objetos ORM e validar cada um com os schemas Pydantic, as
+listagens selecionam apenas as colunas necessárias (tuplas do Core) e geram o
+JSON de uma vez com um TypeAdapter pré-compilado (serializador em Rust do
+pydantic-core). O resultado já sai em bytes e é enviado por RawJSONResponse,
+sem a segunda validação que o FastAPI faria com `response_model`.
+
+As chaves e tipos dos TypedDicts abaixo espelham os schemas de resposta
+(schemas.Transaction, schemas.ShoppingList, schemas.Category).
+"""
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from app import models
+
+
+class RawJSONResponse(Response):
+    """Resposta JSON cujo conteúdo já vem serializado em bytes"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content
+
+
+class TransactionRow(TypedDict):
+    id: int
+    description: str
+    category: str
+    date: date
+    amount: float
+    type: models.TransactionType
+    account_id: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+class ShoppingItemRow(TypedDict):
+    id: int
+    shopping_list_id: int
+    name: str
+    category: str
+    quantity: str
+    estimated_price: float
+    actual_price: Optional[float]
+    is_purchased: bool
+    notes: Optional[str]
+    order: int
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+class ShoppingListRow(TypedDict):
+    id: int
+    name: str
+    month: Optional[str]
+    status: models.ShoppingListStatus
+    total_estimated: float
+    total_spent: float
+    items: List[ShoppingItemRow]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    completed_at: Optional[datetime]
+
+
+class CategoryRow(TypedDict):
+    id: int
+    user_id: int
+    name: str
+    type: models.TransactionType
+    is_default: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+def _columns(model, row_type) -> tuple:
+    return tuple(getattr(model, name) for name in row_type.__annotations__ if name != "items")
+
+
+TRANSACTION_COLUMNS = _columns(models.Transaction, TransactionRow)
+SHOPPING_ITEM_COLUMNS = _columns(models.ShoppingItem, ShoppingItemRow)
+SHOPPING_LIST_COLUMNS = _columns(models.ShoppingList, ShoppingListRow)
+CATEGORY_COLUMNS = _columns(models.Category, CategoryRow)
+
+transactions_adapter = TypeAdapter(List[TransactionRow])
+shopping_lists_adapter = TypeAdapter(List[ShoppingListRow])
+categories_adapter = TypeAdapter(List[CategoryRow])
+
+
+def as_dicts(rows: Iterable[Sequence], columns: tuple) -> List[dict]:
+    """Converte tuplas do Core em dicts com as chaves das colunas"""
+    keys = [column.key for column in columns]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def json_response(adapter: TypeAdapter, rows: List[dict], headers: Optional[dict] = None) -> RawJSONResponse:
+    """Serializa as linhas com o TypeAdapter e devolve a resposta pronta"""
+    return RawJSONResponse(adapter.dump_json(rows), headers=headers)
@@ -0,0 +1,310 @@
+"""
+Operações em conjunto sobre listas de compras.
+
+Conclusão de uma lista com geração de transações: os itens comprados são
+agregados por categoria no banco, as transações entram em um único INSERT em
+lote e o saldo da conta recebe um único ajuste.
+
+A conclusão é idempotente: cada transação gerada leva uma chave de
+deduplicação derivada de (lista, categoria) em `Transaction.import_hash`, o
+mesmo índice único (user_id, import_hash) que protege a importação de extratos.
+Uma requisição repetida, ou a mesma lista concluída de novo depois de
+reaberta, não gera lançamentos nem débitos em dobro.
+
+Totais: `total_estimated` e `total_spent` são derivados dos itens, nunca
+mantidos por aritmética incremental nem aceitos do cliente. Toda mutação de
+itens termina com `recompute_totals`, um único UPDATE agregado por lote, com a
+lista travada desde o início da requisição (edições paralelas da mesma lista
+ficam em fila). `recompute_all_totals` refaz a conta de todas as listas em
+blocos e informa a divergência que corrigiu.
+
+Duplicação: `duplicate_lists` copia listas e itens sem trazer os itens para o
+Python. Os totais das origens vêm de uma consulta, os cabeçalhos entram em um
+único INSERT em lote e os itens de todas as cópias em um único
+INSERT ... SELECT — o número de comandos não depende de quantas listas são
+copiadas.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, false, func, insert, null, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.balances import BalanceDeltas
+from app.rollups import SummaryDeltas
+
+DESCRIPTION_ITEM_LIMIT = 5
+RECOMPUTE_CHUNK_SIZE = 1000
+# Divergências menores que isso são arredondamento de float, não drift
+DRIFT_TOLERANCE = 0.005
+
+
+def completion_hash(list_id: int, category: str) -> str:
+    """Chave de deduplicação da transação gerada para uma categoria da lista"""
+    key = f"shopping-list|{list_id}|{category}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _purchased_by_category(db: Session, list_id: int):
+    """
+    Uma consulta: total e quantidade de itens comprados por categoria (agregação
+    particionada por categoria) mais os primeiros nomes, para a descrição.
+    """
+    items = models.ShoppingItem
+    # Preço real quando informado (e diferente de zero), senão o estimado
+    price = func.coalesce(func.nullif(items.actual_price, 0), items.estimated_price)
+    ranked = (
+        select(
+            items.category,
+            items.name,
+            func.sum(price).over(partition_by=items.category).label("total"),
+            func.count().over(partition_by=items.category).label("item_count"),
+            func.row_number().over(
+                partition_by=items.category, order_by=(items.order, items.id)
+            ).label("position"),
+        )
+        .where(items.shopping_list_id == list_id, items.is_purchased.is_(True))
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked)
+        .where(ranked.c.position <= DESCRIPTION_ITEM_LIMIT)
+        .order_by(ranked.c.category, ranked.c.position)
+    )
+
+    categories = {}
+    for row in rows:
+        entry = categories.setdefault(
+            row.category, {"total": row.total, "item_count": row.item_count, "names": []}
+        )
+        entry["names"].append(row.name)
+    return categories
+
+
+def create_completion_transactions(
+    db: Session,
+    user_id: int,
+    shopping_list: models.ShoppingList,
+    account_id: Optional[int],
+    transaction_date: date,
+) -> int:
+    """
+    Gera uma despesa por categoria de itens comprados e ajusta o saldo da conta.
+    Não faz commit. Retorna quantas transações foram criadas.
+    """
+    categories = _purchased_by_category(db, shopping_list.id)
+    if not categories:
+        return 0
+
+    hashes = {category: completion_hash(shopping_list.id, category) for category in categories}
+    already_created = set(db.scalars(
+        select(models.Transaction.import_hash).where(
+            models.Transaction.user_id == user_id,
+            models.Transaction.import_hash.in_(list(hashes.values()))
+        )
+    ))
+
+    rows = []
+    summary = SummaryDeltas()
+    balances = BalanceDeltas()
+    for category, data in categories.items():
+        if hashes[category] in already_created:
+            continue
+
+        items_list = ", ".join(data["names"])
+        if data["item_count"] > DESCRIPTION_ITEM_LIMIT:
+            items_list += f" (+{data['item_count'] - DESCRIPTION_ITEM_LIMIT} mais)"
+
+        rows.append({
+            "user_id": user_id,
+            "account_id": account_id,  # Pode ser None
+            "description": f"Compras - {shopping_list.name}: {items_list}",
+            "amount": data["total"],
+            "type": models.TransactionType.expense,
+            "category": category,
+            "date": transaction_date,
+            "import_hash": hashes[category],
+        })
+        summary.add(transaction_date, category, models.TransactionType.expense, data["total"])
+        balances.add(account_id, models.TransactionType.expense, data["total"])
+
+    if rows:
+        db.execute(insert(models.Transaction), rows)
+        # Um único ajuste de saldo para todas as categorias
+        summary.apply(db, user_id)
+        balances.apply(db, user_id)
+    return len(rows)
+
+
+def _totals_columns(list_id_column):
+    """Subconsultas correlacionadas com os totais calculados a partir dos itens"""
+    items = models.ShoppingItem
+    total_estimated = (
+        select(func.coalesce(func.sum(items.estimated_price), 0.0))
+        .where(items.shopping_list_id == list_id_column)
+        .scalar_subquery()
+    )
+    total_spent = (
+        select(func.coalesce(func.sum(
+            case((items.is_purchased, func.coalesce(items.actual_price, 0.0)), else_=0.0)
+        ), 0.0))
+        .where(items.shopping_list_id == list_id_column)
+        .scalar_subquery()
+    )
+    return total_estimated, total_spent
+
+
+def recompute_totals(db: Session, list_ids: Iterable[int]) -> None:
+    """Recalcula os totais das listas a partir dos itens, em um único UPDATE. Não faz commit."""
+    list_ids = list(list_ids)
+    if not list_ids:
+        return
+    total_estimated, total_spent = _totals_columns(models.ShoppingList.id)
+    db.execute(
+        update(models.ShoppingList)
+        .where(models.ShoppingList.id.in_(list_ids))
+        .values(total_estimated=total_estimated, total_spent=total_spent),
+        execution_options={"synchronize_session": False}
+    )
+
+
+@dataclass
+class TotalsDriftReport:
+    lists_checked: int = 0
+    lists_corrected: int = 0
+    estimated_drift: float = 0.0  # soma das diferenças absolutas corrigidas
+    spent_drift: float = 0.0
+    samples: List[dict] = field(default_factory=list)
+
+
+def recompute_all_totals(
+    db: Session,
+    chunk_size: int = RECOMPUTE_CHUNK_SIZE,
+    dry_run: bool = False,
+    max_samples: int = 20,
+) -> TotalsDriftReport:
+    """
+    Job offline: confere os totais de todas as listas em blocos de `chunk_size`
+    (paginação por id), regrava só as que divergem e faz commit por bloco, para
+    não segurar locks nem uma transação longa.
+    """
+    report = TotalsDriftReport()
+    lists = models.ShoppingList
+    total_estimated, total_spent = _totals_columns(lists.id)
+    last_id = 0
+
+    while True:
+        rows = db.execute(
+            select(
+                lists.id,
+                lists.total_estimated,
+                lists.total_spent,
+                total_estimated.label("expected_estimated"),
+                total_spent.label("expected_spent"),
+            )
+            .where(lists.id > last_id)
+            .order_by(lists.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        report.lists_checked += len(rows)
+
+        corrections = []
+        for row in rows:
+            estimated_diff = row.expected_estimated - (row.total_estimated or 0.0)
+            spent_diff = row.expected_spent - (row.total_spent or 0.0)
+            if abs(estimated_diff) <= DRIFT_TOLERANCE and abs(spent_diff) <= DRIFT_TOLERANCE:
+                continue
+            corrections.append(row.id)
+            report.estimated_drift += abs(estimated_diff)
+            report.spent_drift += abs(spent_diff)
+            if len(report.samples) < max_samples:
+                report.samples.append({
+                    "id": row.id,
+                    "total_estimated": (row.total_estimated, row.expected_estimated),
+                    "total_spent": (row.total_spent, row.expected_spent),
+                })
+
+        report.lists_corrected += len(corrections)
+        if corrections and not dry_run:
+            # Regrava com o UPDATE agregado (e não com os valores lidos acima),
+            # para não desfazer uma edição feita entre a leitura e a escrita
+            recompute_totals(db, corrections)
+            db.commit()
+        else:
+            db.rollback()
+
+    return report
+
+
+def _copy_items(db: Session, source_by_new_id: dict) -> None:
+    """
+    Copia os itens das listas de origem em um único INSERT ... SELECT (preço real
+    e compra zerados). O CASE leva cada cópia à sua origem — o sentido inverso não
+    serviria, porque a mesma origem pode ter várias cópias.
+    """
+    items = models.ShoppingItem
+    copies = aliased(models.ShoppingList)
+    db.execute(
+        insert(items).from_select(
+            ["shopping_list_id", "name", "category", "quantity", "estimated_price",
+             "actual_price", "is_purchased", "notes", "order"],
+            select(
+                copies.id, items.name, items.category, items.quantity, items.estimated_price,
+                null(), false(), items.notes, items.order,
+            )
+            .join(copies, items.shopping_list_id == case(source_by_new_id, value=copies.id))
+            .where(copies.id.in_(list(source_by_new_id)))
+            .order_by(copies.id, items.order, items.id)
+        )
+    )
+
+
+def duplicate_lists(
+    db: Session,
+    user_id: int,
+    copies: Sequence[Tuple[int, str, Optional[str]]],
+) -> List[Optional[int]]:
+    """
+    Duplica listas do usuário com todos os itens, no banco. `copies` são tuplas
+    (lista de origem, nome novo, mês novo). Retorna os ids novos na mesma ordem,
+    com None para origens que não existem ou não são do usuário. Não faz commit.
+    """
+    lists = models.ShoppingList
+    total_estimated, _ = _totals_columns(lists.id)
+    source_ids = {source_id for source_id, _, _ in copies}
+    totals = dict(db.execute(
+        select(lists.id, total_estimated).where(lists.id.in_(source_ids), lists.user_id == user_id)
+    ).all())
+
+    # Sem sort_by_parameter_order: no SQLite ele vira um INSERT por linha. Cada
+    # cópia fica com um id cujo cabeçalho é igual ao dela; cópias com cabeçalhos
+    # iguais são intercambiáveis
+    rows = [
+        {
+            "user_id": user_id, "name": new_name, "month": new_month,
+            "status": models.ShoppingListStatus.active,
+            "total_estimated": totals[source_id], "total_spent": 0.0,
+        }
+        for source_id, new_name, new_month in copies
+        if source_id in totals
+    ]
+    if not rows:
+        return [None] * len(copies)
+    created = {}
+    for row in db.execute(
+        insert(lists).returning(lists.id, lists.name, lists.month, lists.total_estimated), rows
+    ):
+        created.setdefault((row.name, row.month, row.total_estimated), []).append(row.id)
+    new_ids = [
+        created[(new_name, new_month, totals[source_id])].pop() if source_id in totals else None
+        for source_id, new_name, new_month in copies
+    ]
+
+    _copy_items(db, {new_id: source_id for (source_id, _, _), new_id in zip(copies, new_ids) if new_id})
+    return new_ids
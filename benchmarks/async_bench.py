@@ -0,0 +1,134 @@
+"""
+Compara vazão e latência das rotas síncronas (threadpool + psycopg2) com as
+assíncronas (AsyncSession + asyncpg/aiosqlite) sob a mesma carga.
+
+As duas rotas executam a mesma consulta (contas do usuário) e são montadas em
+um app próprio, para que a única diferença seja o caminho sync/async. As rotas
+síncronas ficam limitadas pelo threadpool do AnyIO (40 threads por padrão);
+use `--concurrency` acima disso para ver o efeito. `--query-delay-ms` soma um
+`pg_sleep` à consulta (só PostgreSQL) para simular um banco com latência.
+
+Usa o DATABASE_URL (o banco precisa estar migrado; SQLite é criado na hora):
+
+    uv run python -m benchmarks.async_bench --concurrency 200 --seconds 10 --json
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base, SessionLocal, async_engine, engine, get_async_db, get_db
+from benchmarks.stats import percentile_ms
+
+
+def _statement(user_id: int, delay_ms: float):
+    stmt = select(models.Account.id, models.Account.name, models.Account.balance).where(
+        models.Account.user_id == user_id
+    )
+    if delay_ms and engine.dialect.name == "postgresql":
+        stmt = stmt.where(func.pg_sleep(delay_ms / 1000).is_not(None))
+    return stmt
+
+
+def build_app(user_id: int, delay_ms: float) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/sync")
+    def sync_route(db: Session = Depends(get_db)):
+        return [row._asdict() for row in db.execute(_statement(user_id, delay_ms))]
+
+    @bench.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        return [row._asdict() for row in await db.execute(_statement(user_id, delay_ms))]
+
+    return bench
+
+
+def _seed(accounts: int) -> int:
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        tag = uuid.uuid4().hex[:12]
+        user = models.User(email=f"bench-{tag}@example.com", username=f"bench-{tag}", hashed_password="-", is_active=1)
+        db.add(user)
+        db.flush()
+        db.execute(insert(models.Account), [
+            {"user_id": user.id, "name": f"Conta {i}", "bank": "Bench", "balance": float(i)}
+            for i in range(accounts)
+        ])
+        db.commit()
+        return user.id
+
+
+async def _worker(client, path, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(path)
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(response.status_code)
+
+
+async def _run_path(bench, path: str, concurrency: int, seconds: float) -> dict:
+    transport = httpx.ASGITransport(app=bench)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # aquece o pool de conexões
+        latencies, errors = [], []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(
+            _worker(client, path, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile_ms(latencies, 50), 2) if latencies else None,
+        "p99_ms": round(percentile_ms(latencies, 99), 2) if latencies else None,
+    }
+
+
+async def run(concurrency: int, seconds: float, accounts: int, delay_ms: float) -> dict:
+    user_id = _seed(accounts)
+    bench = build_app(user_id, delay_ms)
+    results = {
+        "database": engine.dialect.name,
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "sync": await _run_path(bench, "/sync", concurrency, seconds),
+        "async": await _run_path(bench, "/async", concurrency, seconds),
+    }
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--query-delay-ms", type=float, default=0)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.concurrency, args.seconds, args.accounts, args.query_delay_ms))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['database']}  concurrency={results['concurrency']}  {results['seconds']}s por caminho")
+    for path in ("sync", "async"):
+        r = results[path]
+        print(f"{path:>6}: {r['rps']:>8} req/s  p50={r['p50_ms']}ms  p99={r['p99_ms']}ms  erros={r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Teste de estresse de concorrência dos saldos de conta.
+
+Várias threads aplicam ajustes na mesma conta ao mesmo tempo, cada ajuste em
+sua própria sessão/transação, como requisições vindas de dois dispositivos.
+No final o saldo gravado é comparado com o esperado e a vazão é reportada.
+
+    uv run python -m benchmarks.balance_stress --threads 16 --ops 200
+    uv run python -m benchmarks.balance_stress --mode naive   # read-modify-write antigo
+
+Use um banco PostgreSQL (DATABASE_URL); o SQLite serializa as escritas e não
+exercita o cenário de concorrência.
+"""
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app import models
+from app.balances import adjust_balance
+from app.database import SessionLocal
+
+INITIAL_BALANCE = 1000.0
+
+
+def _setup():
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:12]
+        user = models.User(
+            email=f"stress-{tag}@example.com",
+            username=f"stress-{tag}",
+            hashed_password="-",
+            is_active=1,
+        )
+        db.add(user)
+        db.flush()
+        account = models.Account(user_id=user.id, name="Stress", bank="Stress", balance=INITIAL_BALANCE)
+        db.add(account)
+        db.commit()
+        return user.id, account.id
+    finally:
+        db.close()
+
+
+def _teardown(user_id: int):
+    db = SessionLocal()
+    try:
+        db.delete(db.get(models.User, user_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _atomic_worker(user_id: int, account_id: int, deltas):
+    for delta in deltas:
+        db = SessionLocal()
+        try:
+            adjust_balance(db, user_id, account_id, delta)
+            db.commit()
+        finally:
+            db.close()
+
+
+def _naive_worker(user_id: int, account_id: int, deltas):
+    for delta in deltas:
+        db = SessionLocal()
+        try:
+            account = db.get(models.Account, account_id)
+            account.balance += delta
+            db.commit()
+        finally:
+            db.close()
+
+
+WORKERS = {"atomic": _atomic_worker, "naive": _naive_worker}
+
+
+def run(mode: str, threads: int, ops: int) -> dict:
+    user_id, account_id = _setup()
+    try:
+        # Valores inteiros: a soma em float é exata e a comparação pode ser estrita
+        plans = [
+            [float((t + i) % 7 - 3) or 1.0 for i in range(ops)]
+            for t in range(threads)
+        ]
+        expected = INITIAL_BALANCE + sum(sum(plan) for plan in plans)
+
+        worker = WORKERS[mode]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(worker, user_id, account_id, plan) for plan in plans]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        db = SessionLocal()
+        try:
+            final = db.get(models.Account, account_id).balance
+        finally:
+            db.close()
+
+        total_ops = threads * ops
+        return {
+            "mode": mode,
+            "threads": threads,
+            "operations": total_ops,
+            "seconds": round(elapsed, 3),
+            "ops_per_second": round(total_ops / elapsed, 1),
+            "expected_balance": expected,
+            "final_balance": final,
+            "exact": final == expected,
+        }
+    finally:
+        _teardown(user_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=sorted(WORKERS), default="atomic")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="ajustes por thread")
+    args = parser.parse_args()
+
+    result = run(args.mode, args.threads, args.ops)
+    for key, value in result.items():
+        print(f"{key:>18}: {value}")
+    if not result["exact"]:
+        print(f"\n❌ Saldo divergente: {result['final_balance'] - result['expected_balance']:+.2f}")
+        raise SystemExit(1)
+    print("\n✅ Saldo final exato")
+
+
+if __name__ == "__main__":
+    main()
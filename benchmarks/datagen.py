@@ -0,0 +1,324 @@
+"""
+Gerador de dados sintéticos para os benchmarks.
+
+Cria usuários com contas, cartões, investimentos, metas, categorias padrão,
+transações (recorrentes + gastos do dia a dia) e listas de compras com itens,
+sempre com inserts em lote do Core. É determinístico para a mesma `--seed`.
+Saldos das contas, totais das listas, o resumo mensal e o histórico de preços
+dos itens comprados saem consistentes com as linhas geradas.
+
+Grava um manifesto JSON (usuários, senha, ids e termos de busca) usado por
+benchmarks.journeys para logar e montar as jornadas.
+
+Usa o DATABASE_URL (o banco precisa estar migrado; SQLite é criado na hora):
+
+    uv run python -m benchmarks.datagen --users 200 --transactions 2000000 \\
+        --manifest benchmarks/results/dataset.json
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth import get_password_hash
+from app.database import Base, engine
+from app.prices import PriceHistoryDeltas, purchased_price
+
+PASSWORD = "bench-password"
+
+INCOME_CATEGORIES = ["Salário", "Freelance", "Investimentos", "Bônus", "Presente", "Venda", "Outros"]
+EXPENSE_CATEGORIES = [
+    "Alimentação", "Transporte", "Moradia", "Saúde", "Educação",
+    "Lazer", "Compras", "Contas", "Vestuário", "Outros",
+]
+
+# (descrição, categoria, valor médio) dos gastos avulsos
+MERCHANTS = [
+    ("Supermercado Pão de Açúcar", "Alimentação", 180), ("Carrefour", "Alimentação", 220),
+    ("Padaria Real", "Alimentação", 25), ("iFood *Restaurante", "Alimentação", 55),
+    ("Uber *Trip", "Transporte", 28), ("99 Pop", "Transporte", 22), ("Posto Shell", "Transporte", 210),
+    ("Drogasil", "Saúde", 75), ("Droga Raia", "Saúde", 60), ("Consulta Dr. Silva", "Saúde", 350),
+    ("Cinemark", "Lazer", 70), ("Steam Games", "Lazer", 90), ("Bar do Zé", "Lazer", 110),
+    ("Amazon.com.br", "Compras", 160), ("Mercado Livre", "Compras", 130), ("Magazine Luiza", "Compras", 400),
+    ("Renner", "Vestuário", 190), ("Riachuelo", "Vestuário", 150), ("Livraria Cultura", "Educação", 85),
+]
+RECURRING_EXPENSES = [
+    ("Aluguel Apartamento", "Moradia", 2200, 10), ("Condomínio", "Moradia", 650, 10),
+    ("Conta de Luz Enel", "Contas", 180, 15), ("Internet Vivo Fibra", "Contas", 120, 20),
+    ("Netflix.com", "Lazer", 55.90, 22), ("Spotify", "Lazer", 21.90, 8), ("Academia Smart Fit", "Saúde", 119.90, 5),
+]
+GROCERIES = [
+    ("Arroz 5kg", "Mercearia", 28), ("Feijão carioca", "Mercearia", 9), ("Café 500g", "Mercearia", 19),
+    ("Leite integral", "Laticínios", 5.5), ("Queijo mussarela", "Laticínios", 42), ("Iogurte", "Laticínios", 12),
+    ("Banana prata", "Frutas", 7), ("Maçã gala", "Frutas", 11), ("Tomate", "Hortifruti", 9),
+    ("Cebola", "Hortifruti", 6), ("Alface", "Hortifruti", 4), ("Peito de frango", "Carnes", 24),
+    ("Carne moída", "Carnes", 38), ("Detergente", "Limpeza", 3), ("Sabão em pó", "Limpeza", 22),
+    ("Papel higiênico", "Higiene", 21), ("Pasta de dente", "Higiene", 8), ("Pão de forma", "Padaria", 9),
+]
+BANKS = ["Nubank", "Itaú", "Bradesco", "Banco do Brasil", "Inter", "Caixa"]
+SEARCH_TERMS = ["mercado", "uber", "netflix", "aluguel", "farmacia", "amazon", "ifood", "posto"]
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class DatasetGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.today = date.today()
+        self.start = self.today - timedelta(days=30 * args.months)
+        self.hashed_password = get_password_hash(PASSWORD)
+        self.counts = defaultdict(int)
+
+    def _insert_returning_ids(self, conn, model, rows):
+        ids = []
+        for batch in _chunks(rows, self.args.batch_size):
+            ids += conn.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), batch).all()
+        self.counts[model.__tablename__] += len(rows)
+        return ids
+
+    def _insert(self, conn, model, rows):
+        for batch in _chunks(rows, self.args.batch_size):
+            conn.execute(insert(model), batch)
+        self.counts[model.__tablename__] += len(rows)
+
+    def _users(self, conn):
+        rows = [
+            {
+                "email": f"{self.args.prefix}-{i}@example.com",
+                "username": f"{self.args.prefix}-{i}",
+                "full_name": f"Usuário Benchmark {i}",
+                "hashed_password": self.hashed_password,
+                "is_active": 1,
+            }
+            for i in range(self.args.users)
+        ]
+        return self._insert_returning_ids(conn, models.User, rows)
+
+    def _per_user_entities(self, conn, user_ids):
+        accounts, cards, investments, goals, categories = [], [], [], [], []
+        for user_id in user_ids:
+            for n in range(self.args.accounts_per_user):
+                accounts.append({
+                    "user_id": user_id, "name": f"Conta {n + 1}", "bank": self.rng.choice(BANKS),
+                    "balance": 0.0, "investments": round(self.rng.uniform(0, 20000), 2),
+                })
+            cards.append({
+                "user_id": user_id, "name": "Cartão principal", "bank": self.rng.choice(BANKS),
+                "used": self.rng.randint(0, 500000), "limit": 1000000,
+            })
+            investments.append({
+                "user_id": user_id, "name": "Tesouro Selic", "type": models.InvestmentType.renda_fixa,
+                "value": round(self.rng.uniform(1000, 50000), 2), "return_rate": 10.5,
+            })
+            goals.append({
+                "user_id": user_id, "name": "Reserva de emergência",
+                "target": 30000.0, "current": round(self.rng.uniform(0, 30000), 2),
+            })
+            for name in INCOME_CATEGORIES:
+                categories.append({"user_id": user_id, "name": name, "type": models.TransactionType.income, "is_default": True})
+            for name in EXPENSE_CATEGORIES:
+                categories.append({"user_id": user_id, "name": name, "type": models.TransactionType.expense, "is_default": True})
+
+        account_ids = self._insert_returning_ids(conn, models.Account, accounts)
+        self._insert(conn, models.CreditCard, cards)
+        self._insert(conn, models.Investment, investments)
+        self._insert(conn, models.Goal, goals)
+        self._insert(conn, models.Category, categories)
+
+        per_user = self.args.accounts_per_user
+        return {user_id: account_ids[i * per_user:(i + 1) * per_user] for i, user_id in enumerate(user_ids)}
+
+    def _transactions_for(self, user_id, account_ids, count):
+        rows = []
+        # Recorrentes: salário e contas fixas todo mês
+        month = date(self.start.year, self.start.month, 1)
+        salary = round(self.rng.uniform(4000, 15000), 2)
+        while month <= self.today and len(rows) < count:
+            rows.append({
+                "user_id": user_id, "description": "Salário ACME Ltda", "category": "Salário",
+                "date": month.replace(day=5), "amount": salary,
+                "type": models.TransactionType.income, "account_id": account_ids[0],
+            })
+            for description, category, amount, day in RECURRING_EXPENSES:
+                rows.append({
+                    "user_id": user_id, "description": description, "category": category,
+                    "date": month.replace(day=day), "amount": amount,
+                    "type": models.TransactionType.expense, "account_id": account_ids[0],
+                })
+            month = (month + timedelta(days=32)).replace(day=1)
+        rows = [row for row in rows if row["date"] <= self.today][:count]
+
+        # Avulsos até completar a quantidade pedida
+        span = (self.today - self.start).days
+        while len(rows) < count:
+            description, category, mean = self.rng.choice(MERCHANTS)
+            rows.append({
+                "user_id": user_id,
+                "description": f"{description} {self.rng.randint(1000, 9999)}",
+                "category": category,
+                "date": self.start + timedelta(days=self.rng.randrange(span + 1)),
+                "amount": round(max(1.0, self.rng.gauss(mean, mean / 3)), 2),
+                "type": models.TransactionType.expense,
+                "account_id": self.rng.choice(account_ids),
+            })
+        return rows
+
+    def _transactions(self, user_ids, accounts_by_user):
+        per_user, extra = divmod(self.args.transactions, len(user_ids))
+        for index, user_id in enumerate(user_ids):
+            rows = self._transactions_for(user_id, accounts_by_user[user_id], per_user + (1 if index < extra else 0))
+            balances = defaultdict(float)
+            for row in rows:
+                sign = 1 if row["type"] == models.TransactionType.income else -1
+                balances[row["account_id"]] += sign * row["amount"]
+
+            with engine.begin() as conn:
+                self._insert(conn, models.Transaction, rows)
+                for account_id, balance in balances.items():
+                    conn.execute(
+                        models.Account.__table__.update()
+                        .where(models.Account.id == account_id)
+                        .values(balance=round(balance, 2))
+                    )
+            if (index + 1) % 10 == 0 or index + 1 == len(user_ids):
+                print(f"  transações: {index + 1}/{len(user_ids)} usuários")
+
+    def _shopping_lists(self, conn, user_ids):
+        lists, list_items = [], []
+        prices_by_user = {}
+        for user_id in user_ids:
+            # Listas em ordem cronológica: o último preço do histórico é o mais recente
+            prices = prices_by_user[user_id] = PriceHistoryDeltas()
+            for n in range(self.args.lists_per_user):
+                completed = n < self.args.lists_per_user - 1  # a mais recente fica ativa
+                items = []
+                for order in range(self.args.items_per_list):
+                    name, category, price = self.rng.choice(GROCERIES)
+                    estimated = round(price * self.rng.uniform(0.8, 1.2), 2)
+                    purchased = completed or self.rng.random() < 0.3
+                    actual = round(estimated * self.rng.uniform(0.9, 1.1), 2) if purchased else None
+                    recorded = purchased_price(purchased, actual)
+                    prices.add(name, recorded)
+                    items.append({
+                        "name": name, "category": category, "quantity": f"{self.rng.randint(1, 4)} un",
+                        "estimated_price": estimated, "actual_price": actual,
+                        "is_purchased": purchased, "order": order, "recorded_price": recorded,
+                    })
+                month = (self.today - timedelta(days=30 * (self.args.lists_per_user - 1 - n))).strftime("%Y-%m")
+                lists.append({
+                    "user_id": user_id, "name": f"Compras {month}", "month": month,
+                    "status": models.ShoppingListStatus.completed if completed else models.ShoppingListStatus.active,
+                    "total_estimated": round(sum(item["estimated_price"] for item in items), 2),
+                    "total_spent": round(sum(item["actual_price"] or 0 for item in items if item["is_purchased"]), 2),
+                    "completed_at": datetime.now(timezone.utc) if completed else None,
+                })
+                list_items.append(items)
+
+        list_ids = self._insert_returning_ids(conn, models.ShoppingList, lists)
+        rows = [
+            dict(item, shopping_list_id=list_id)
+            for list_id, items in zip(list_ids, list_items)
+            for item in items
+        ]
+        self._insert(conn, models.ShoppingItem, rows)
+
+        # Histórico de preços com o mesmo upsert da API, na transação de `conn`
+        db = Session(bind=conn)
+        for user_id, prices in prices_by_user.items():
+            prices.apply(db, user_id)
+        self.counts[models.ItemPriceStat.__tablename__] += db.scalar(
+            select(func.count()).select_from(models.ItemPriceStat).where(models.ItemPriceStat.user_id.in_(user_ids))
+        )
+
+        per_user = self.args.lists_per_user
+        return {user_id: list_ids[i * per_user:(i + 1) * per_user] for i, user_id in enumerate(user_ids)}
+
+    def _rebuild_monthly_summary(self, user_ids):
+        summary = models.MonthlyCategorySummary
+        transaction = models.Transaction
+        if engine.dialect.name == "postgresql":
+            month = func.to_char(transaction.date, "YYYY-MM")
+        else:
+            month = func.strftime("%Y-%m", transaction.date)
+        with engine.begin() as conn:
+            conn.execute(delete(summary).where(summary.user_id.in_(user_ids)))
+            conn.execute(insert(summary).from_select(
+                ["user_id", "month", "category", "type", "total", "count"],
+                select(
+                    transaction.user_id, month, transaction.category, transaction.type,
+                    func.sum(transaction.amount), func.count(),
+                )
+                .where(transaction.user_id.in_(user_ids))
+                .group_by(transaction.user_id, month, transaction.category, transaction.type)
+            ))
+
+    def run(self) -> dict:
+        if engine.dialect.name == "sqlite":
+            Base.metadata.create_all(engine)
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            user_ids = self._users(conn)
+            accounts_by_user = self._per_user_entities(conn, user_ids)
+            lists_by_user = self._shopping_lists(conn, user_ids)
+        self._transactions(user_ids, accounts_by_user)
+        self._rebuild_monthly_summary(user_ids)
+        elapsed = time.perf_counter() - started
+
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": engine.dialect.name,
+            "seed": self.args.seed,
+            "params": {key: value for key, value in vars(self.args).items() if key != "manifest"},
+            "rows": dict(self.counts),
+            "seconds": round(elapsed, 1),
+            "password": PASSWORD,
+            "search_terms": SEARCH_TERMS,
+            "users": [
+                {
+                    "id": user_id,
+                    "username": f"{self.args.prefix}-{i}",
+                    "account_ids": accounts_by_user[user_id],
+                    "shopping_list_ids": lists_by_user[user_id],
+                }
+                for i, user_id in enumerate(user_ids)
+            ],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--transactions", type=int, default=100_000, help="total, dividido entre os usuários")
+    parser.add_argument("--accounts-per-user", type=int, default=3)
+    parser.add_argument("--lists-per-user", type=int, default=12)
+    parser.add_argument("--items-per-list", type=int, default=30)
+    parser.add_argument("--months", type=int, default=24, help="histórico gerado, em meses até hoje")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="bench", help="prefixo dos usernames (precisa ser novo no banco)")
+    parser.add_argument("--manifest", default="benchmarks/results/dataset.json")
+    args = parser.parse_args()
+
+    manifest = DatasetGenerator(args).run()
+    path = Path(args.manifest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+
+    print(f"{manifest['database']}: {manifest['rows']} em {manifest['seconds']}s")
+    print(f"manifesto: {path}")
+
+
+if __name__ == "__main__":
+    main()
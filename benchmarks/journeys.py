@@ -0,0 +1,326 @@
+"""
+Jornadas de usuário contra a aplicação real, com vazão e percentis por endpoint.
+
+Cada usuário virtual loga com um usuário do manifesto gerado por
+benchmarks.datagen e repete jornadas sorteadas por peso (abrir o app, navegar
+no extrato, buscar, lançar e desfazer uma transação, mexer na lista de compras,
+ver a previsão). Sem `--base-url` a aplicação roda no mesmo processo (ASGI);
+com ela, as requisições vão por HTTP para um uvicorn já no ar.
+
+O resultado vai para um JSON (metadados da execução + estatísticas por endpoint
+e por jornada); `--compare` imprime a diferença para um resultado anterior.
+
+    uv run python -m benchmarks.journeys --concurrency 50 --seconds 60 \\
+        --output benchmarks/results/run.json --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stats import percentile_ms
+
+PERCENTILES = (50, 90, 95, 99)
+# Renova o access token com esta folga antes de expirar
+REFRESH_MARGIN_SECONDS = 60
+
+
+def _token_expiry(access_token: str) -> float:
+    """Instante (epoch) de expiração do JWT, lido do payload sem validar a assinatura"""
+    payload = access_token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["exp"]
+
+
+def summarize(latencies, errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    result = {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / seconds, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else None,
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else None,
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = round(percentile_ms(ordered, pct), 2) if ordered else None
+    return result
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    async def request(self, client, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            self.error_samples.setdefault(name, f"{response.status_code} {response.text[:200]}")
+        else:
+            self.latencies[name].append(elapsed)
+        return response
+
+
+class VirtualUser:
+    def __init__(self, client, recorder: Recorder, profile: dict, manifest: dict, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.profile = profile
+        self.manifest = manifest
+        self.rng = rng
+        self.refresh_token = None
+        self.expires_at = 0.0
+
+    def _set_tokens(self, tokens: dict):
+        self.client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+        self.refresh_token = tokens["refresh_token"]
+        self.expires_at = _token_expiry(tokens["access_token"])
+
+    async def refresh(self):
+        """Rotaciona o refresh token; se a sessão caiu, loga de novo"""
+        response = await self.recorder.request(
+            self.client, "POST /auth/refresh", "POST", "/auth/refresh",
+            json={"refresh_token": self.refresh_token},
+        )
+        if response.status_code == 200:
+            self._set_tokens(response.json())
+        else:
+            await self.login()
+
+    async def call(self, name, method, url, **kwargs):
+        # Jornadas mais longas que o access token (15 min por padrão) renovam
+        # antes de expirar; um 401 ainda assim (sessão revogada, relógio) renova
+        # e repete a requisição uma vez
+        if self.refresh_token and time.time() > self.expires_at - REFRESH_MARGIN_SECONDS:
+            await self.refresh()
+        response = await self.recorder.request(self.client, name, method, url, **kwargs)
+        if response.status_code == 401 and self.refresh_token:
+            await self.refresh()
+            response = await self.recorder.request(self.client, name, method, url, **kwargs)
+        return response
+
+    async def login(self):
+        credentials = {"username": self.profile["username"], "password": self.manifest["password"]}
+
+        def login():
+            return self.recorder.request(self.client, "POST /auth/login", "POST", "/auth/login", data=credentials)
+
+        response = await login()
+        # O pool de bcrypt recusa rajadas com 503: espera e tenta de novo
+        while response.status_code == 503:
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)) * self.rng.random())
+            response = await login()
+        response.raise_for_status()
+        self._set_tokens(response.json())
+
+    async def open_app(self):
+        await self.call("GET /dashboard/", "GET", "/dashboard/")
+        await self.call("GET /transactions/", "GET", "/transactions/", params={"limit": 50})
+        await self.call("GET /accounts/", "GET", "/accounts/")
+
+    async def browse_statement(self):
+        cursor = None
+        for _ in range(3):
+            params = {"limit": 100}
+            if cursor:
+                params["cursor"] = cursor
+            response = await self.call("GET /transactions/", "GET", "/transactions/", params=params)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        await self.call("GET /transactions/summary", "GET", "/transactions/summary")
+        await self.call("GET /categories/", "GET", "/categories/")
+
+    async def search(self):
+        term = self.rng.choice(self.manifest["search_terms"])
+        await self.call("GET /transactions/search", "GET", "/transactions/search", params={"q": term})
+
+    async def record_transaction(self):
+        response = await self.call("POST /transactions/", "POST", "/transactions/", json={
+            "description": "Padaria benchmark",
+            "category": "Alimentação",
+            "date": datetime.now().date().isoformat(),
+            "amount": round(self.rng.uniform(5, 50), 2),
+            "type": "expense",
+            "account_id": self.rng.choice(self.profile["account_ids"]),
+        })
+        if response.status_code != 201:
+            return
+        transaction_id = response.json()["id"]
+        await self.call("GET /transactions/{id}", "GET", f"/transactions/{transaction_id}")
+        await self.call("PUT /transactions/{id}", "PUT", f"/transactions/{transaction_id}", json={"amount": 12.5})
+        # Desfaz para o conjunto de dados não crescer entre execuções
+        await self.call("DELETE /transactions/{id}", "DELETE", f"/transactions/{transaction_id}")
+
+    async def shopping(self):
+        await self.call("GET /shopping-lists/", "GET", "/shopping-lists/", params={"limit": 20})
+        list_id = self.profile["shopping_list_ids"][-1]  # a lista ativa
+        response = await self.call("GET /shopping-lists/{id}", "GET", f"/shopping-lists/{list_id}")
+        items = response.json().get("items", []) if response.status_code == 200 else []
+        if items:
+            item = self.rng.choice(items)
+            url = f"/shopping-lists/{list_id}/items/{item['id']}"
+            name = "PUT /shopping-lists/{id}/items/{item_id}"
+            await self.call(name, "PUT", url, json={"is_purchased": not item["is_purchased"], "actual_price": item["estimated_price"]})
+            await self.call(name, "PUT", url, json={"is_purchased": item["is_purchased"], "actual_price": item["actual_price"]})
+
+    async def forecast(self):
+        await self.call("GET /forecast/", "GET", "/forecast/", params={"horizon_days": 60})
+
+
+# (jornada, peso)
+JOURNEYS = [
+    ("open_app", 30),
+    ("browse_statement", 20),
+    ("search", 15),
+    ("record_transaction", 15),
+    ("shopping", 15),
+    ("forecast", 5),
+]
+
+
+async def _run_user(user: VirtualUser, deadline: float, journey_latencies):
+    names = [name for name, _ in JOURNEYS]
+    weights = [weight for _, weight in JOURNEYS]
+    while time.perf_counter() < deadline:
+        journey = user.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        await getattr(user, journey)()
+        journey_latencies[journey].append(time.perf_counter() - started)
+
+
+async def run(args, manifest: dict) -> dict:
+    if args.base_url:
+        make_client = lambda: httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)  # noqa: E731
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        make_client = lambda: httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout)  # noqa: E731
+
+    recorder = Recorder()
+    journey_latencies = defaultdict(list)
+    clients = [make_client() for _ in range(args.concurrency)]
+    try:
+        users = [
+            VirtualUser(client, recorder, manifest["users"][i % len(manifest["users"])], manifest, random.Random(args.seed + i))
+            for i, client in enumerate(clients)
+        ]
+        await asyncio.gather(*(user.login() for user in users))
+        # Logins ficam fora das estatísticas por endpoint (503 do pool de bcrypt são esperados aqui)
+        login_stats = summarize(recorder.latencies.pop("POST /auth/login"), recorder.errors.pop("POST /auth/login", 0), 1)
+        recorder.error_samples.pop("POST /auth/login", None)
+
+        started = time.perf_counter()
+        deadline = started + args.seconds
+        await asyncio.gather(*(_run_user(user, deadline, journey_latencies) for user in users))
+        elapsed = time.perf_counter() - started
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    return {
+        "meta": _metadata(args, manifest),
+        "overall": summarize(all_latencies, sum(recorder.errors.values()), elapsed),
+        "login": {key: login_stats[key] for key in ("requests", "errors", "p50_ms", "p99_ms", "max_ms")},
+        "endpoints": {
+            name: summarize(recorder.latencies[name], recorder.errors.get(name, 0), elapsed)
+            for name in sorted(set(recorder.latencies) | set(recorder.errors))
+        },
+        "journeys": {
+            name: summarize(values, 0, elapsed) for name, values in sorted(journey_latencies.items())
+        },
+        "error_samples": recorder.error_samples,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(args, manifest: dict) -> dict:
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "database": manifest.get("database"),
+        "dataset_rows": manifest.get("rows"),
+        "concurrency": args.concurrency,
+        "seconds": args.seconds,
+        "seed": args.seed,
+    }
+
+
+def print_report(result: dict):
+    meta = result["meta"]
+    print(f"{meta['target']} ({meta['database']})  commit={meta['git_commit']}  "
+          f"concurrency={meta['concurrency']}  {meta['seconds']}s")
+    header = f"{'endpoint':<45}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in list(result["endpoints"].items()) + [("TOTAL", result["overall"])]:
+        print(f"{name:<45}{stats['requests']:>8}{stats['errors']:>6}{stats['rps']:>9}"
+              f"{stats['p50_ms'] or 0:>9}{stats['p95_ms'] or 0:>9}{stats['p99_ms'] or 0:>9}")
+    for name, sample in result["error_samples"].items():
+        print(f"  erro em {name}: {sample}")
+
+
+def print_comparison(result: dict, baseline: dict):
+    print(f"\ncomparação com {baseline['meta'].get('git_commit')} ({baseline['meta'].get('started_at')})")
+    print(f"{'endpoint':<45}{'rps':>18}{'p50 ms':>20}{'p99 ms':>20}")
+    for name, stats in list(result["endpoints"].items()) + [("TOTAL", result["overall"])]:
+        before = baseline["overall"] if name == "TOTAL" else baseline["endpoints"].get(name)
+        if not before:
+            continue
+        cells = []
+        for key in ("rps", "p50_ms", "p99_ms"):
+            old, new = before.get(key), stats.get(key)
+            if not old or new is None:
+                cells.append(f"{'-':>18}")
+                continue
+            cells.append(f"{old:>8} → {new:<8}{(new - old) / old * 100:+.0f}%".rjust(18))
+        print(f"{name:<45}" + "".join(f"{cell:>20}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", default="benchmarks/results/dataset.json")
+    parser.add_argument("--base-url", help="ex. http://localhost:8000 (padrão: app no mesmo processo)")
+    parser.add_argument("--concurrency", type=int, default=20, help="usuários virtuais")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    parser.add_argument("--compare", help="resultado JSON anterior para comparar")
+    args = parser.parse_args()
+
+    manifest = json.loads(Path(args.manifest).read_text())
+    result = asyncio.run(run(args, manifest))
+
+    print_report(result)
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+        print(f"\nresultado: {path}")
+    if args.compare:
+        print_comparison(result, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
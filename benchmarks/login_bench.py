@@ -0,0 +1,98 @@
+"""
+Vazão de login x latência do CRUD sob carga de login.
+
+Dirige a aplicação real em processo (httpx + ASGI) contra o DATABASE_URL:
+    1. mede a latência de GET /accounts/ sozinho (linha de base);
+    2. repete a medição com `--login-concurrency` clientes fazendo login em loop.
+
+O relatório mostra logins/s, logins recusados com 503 pelo pool de bcrypt e
+p50/p99 do CRUD nas duas fases.
+
+    uv run python -m benchmarks.login_bench --seconds 10 --login-concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+from app.main import app
+from benchmarks.stats import percentile_ms
+
+
+async def _crud_loop(client, headers, deadline, latencies):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/accounts/", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _login_loop(client, credentials, deadline, counters):
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/login", data=credentials)
+        if response.status_code == 200:
+            counters["ok"] += 1
+        elif response.status_code == 503:
+            counters["rejected"] += 1
+            await asyncio.sleep(0.01)
+        else:
+            counters["errors"] += 1
+
+
+async def _phase(client, headers, credentials, seconds, crud_concurrency, login_concurrency):
+    deadline = time.perf_counter() + seconds
+    latencies = []
+    counters = {"ok": 0, "rejected": 0, "errors": 0}
+    tasks = [_crud_loop(client, headers, deadline, latencies) for _ in range(crud_concurrency)]
+    tasks += [_login_loop(client, credentials, deadline, counters) for _ in range(login_concurrency)]
+    await asyncio.gather(*tasks)
+    return {
+        "crud_requests": len(latencies),
+        "crud_p50_ms": round(percentile_ms(latencies, 50), 1),
+        "crud_p99_ms": round(percentile_ms(latencies, 99), 1),
+        "crud_mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+        "logins_per_second": round(counters["ok"] / seconds, 1),
+        "logins_rejected_503": counters["rejected"],
+        "login_errors": counters["errors"],
+    }
+
+
+async def run(seconds: float, crud_concurrency: int, login_concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tag = uuid.uuid4().hex[:12]
+        credentials = {"username": f"bench-{tag}", "password": "bench-password"}
+        response = await client.post("/auth/register", json={
+            "email": f"bench-{tag}@example.com",
+            "username": credentials["username"],
+            "password": credentials["password"],
+        })
+        response.raise_for_status()
+        token = (await client.post("/auth/login", data=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/accounts/", json={"name": "Bench", "bank": "Bench", "balance": 0}, headers=headers)
+
+        baseline = await _phase(client, headers, credentials, seconds, crud_concurrency, 0)
+        loaded = await _phase(client, headers, credentials, seconds, crud_concurrency, login_concurrency)
+        return {"baseline": baseline, "with_logins": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--crud-concurrency", type=int, default=8)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.seconds, args.crud_concurrency, args.login_concurrency))
+    for phase, values in result.items():
+        print(phase)
+        for key, value in values.items():
+            print(f"  {key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
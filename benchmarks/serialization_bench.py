@@ -0,0 +1,97 @@
+"""
+Compara o caminho antigo de serialização das listagens com o caminho rápido.
+
+    antigo: objetos ORM -> validação com schemas.Transaction (response_model)
+            -> dump para dict -> json.dumps (JSONResponse)
+    rápido: tuplas do Core -> dicts -> TypeAdapter.dump_json (RawJSONResponse)
+
+Roda em um SQLite em memória próprio, sem depender do DATABASE_URL.
+
+    uv run python -m benchmarks.serialization_bench --rows 50000 --repeat 5
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import Base
+from app.serialization import TRANSACTION_COLUMNS, as_dicts, transactions_adapter
+
+
+def _seed(engine, rows: int):
+    with Session(engine) as db:
+        user = models.User(email="bench@example.com", username="bench", hashed_password="-", is_active=1)
+        db.add(user)
+        db.flush()
+        start = date(2020, 1, 1)
+        db.execute(insert(models.Transaction), [
+            {
+                "user_id": user.id,
+                "description": f"Transação {i}",
+                "category": ("Alimentação", "Transporte", "Moradia", "Salário")[i % 4],
+                "date": start + timedelta(days=i % 1800),
+                "amount": round(10 + (i % 997) * 1.37, 2),
+                "type": models.TransactionType.income if i % 4 == 3 else models.TransactionType.expense,
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+        return user.id
+
+
+def _orm_path(engine, user_id: int, adapter: TypeAdapter) -> bytes:
+    with Session(engine) as db:
+        transactions = db.query(models.Transaction).filter(models.Transaction.user_id == user_id).all()
+        validated = adapter.validate_python(transactions)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def _fast_path(engine, user_id: int) -> bytes:
+    with Session(engine) as db:
+        rows = db.execute(select(*TRANSACTION_COLUMNS).where(models.Transaction.user_id == user_id))
+        return transactions_adapter.dump_json(as_dicts(rows, TRANSACTION_COLUMNS))
+
+
+def _measure(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = fn()
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "bytes": len(payload),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    user_id = _seed(engine, args.rows)
+    orm_adapter = TypeAdapter(List[schemas.Transaction])
+
+    results = {
+        "orm": _measure(lambda: _orm_path(engine, user_id, orm_adapter), args.repeat),
+        "fast": _measure(lambda: _fast_path(engine, user_id), args.repeat),
+    }
+    print(f"{args.rows} transações, {args.repeat} repetições")
+    for name, result in results.items():
+        print(f"  {name:>5}: mediana {result['median_ms']} ms, mínimo {result['min_ms']} ms, {result['bytes']} bytes")
+    print(f"  ganho: {results['orm']['median_ms'] / results['fast']['median_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""Estatísticas comuns aos benchmarks"""
+
+
+def percentile_ms(values, pct: float) -> float:
+    """Percentil (vizinho mais próximo) de latências em segundos, em milissegundos"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
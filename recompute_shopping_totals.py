@@ -0,0 +1,47 @@
+"""
+Script para recalcular os totais das listas de compras a partir dos itens.
+Corrige listas cujos total_estimated / total_spent divergiram e informa o drift.
+
+    uv run recompute_shopping_totals.py [--chunk-size 1000] [--dry-run]
+"""
+import argparse
+
+from app.database import SessionLocal
+from app.shopping import RECOMPUTE_CHUNK_SIZE, recompute_all_totals
+
+
+def recompute_shopping_totals(chunk_size: int, dry_run: bool):
+    """Confere todas as listas em blocos e regrava as que divergem"""
+    db = SessionLocal()
+
+    try:
+        report = recompute_all_totals(db, chunk_size=chunk_size, dry_run=dry_run)
+
+        for sample in report.samples:
+            estimated_before, estimated_after = sample["total_estimated"]
+            spent_before, spent_after = sample["total_spent"]
+            print(f"  🔧 Lista {sample['id']}: estimado {estimated_before:.2f} → {estimated_after:.2f}, "
+                  f"gasto {spent_before:.2f} → {spent_after:.2f}")
+
+        print(f"\n{'='*60}")
+        print(f"✅ Recálculo concluído{' (dry run, nada foi gravado)' if dry_run else ''}")
+        print(f"📊 Listas conferidas: {report.lists_checked}")
+        print(f"🔧 Listas com divergência: {report.lists_corrected}")
+        print(f"💰 Drift corrigido: estimado {report.estimated_drift:.2f}, gasto {report.spent_drift:.2f}")
+        print(f"{'='*60}\n")
+
+    except Exception as e:
+        print(f"\n❌ Erro ao recalcular totais: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=RECOMPUTE_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="só informa a divergência, sem gravar")
+    args = parser.parse_args()
+
+    print("\n🧮 Recalculando totais das listas de compras...\n")
+    recompute_shopping_totals(args.chunk_size, args.dry_run)
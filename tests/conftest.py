@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+# Banco SQLite descartável; precisa estar definido antes de importar app.database
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="cash-plan-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+# Rotas que estouram o @query_budget falham com 500
+os.environ["QUERY_INSPECTION"] = "enforce"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture()
+def client():
+    from app.auth import principal_cache
+    from app.autocomplete import _suggestions_cache
+    from app.database import Base, engine
+    from app.main import app
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    # Caches por id de usuário: o banco recriado reaproveita os ids
+    principal_cache.clear()
+    _suggestions_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+    engine.dispose()
+
+
+@pytest.fixture()
+def auth_client(client):
+    """Cliente já autenticado; a resposta do login fica em `client.tokens`"""
+    client.post("/auth/register", json={"email": "user@example.com", "username": "user", "password": "secret"})
+    response = client.post("/auth/login", data={"username": "user", "password": "secret"})
+    assert response.status_code == 200, response.text
+    client.tokens = response.json()
+    client.headers["Authorization"] = f"Bearer {client.tokens['access_token']}"
+    return client
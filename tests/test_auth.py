@@ -0,0 +1,74 @@
+import asyncio
+
+from jose import jwt
+
+from app import auth
+from app.database import SessionLocal
+
+
+def _refresh(client, refresh_token):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def _me(client, access_token):
+    return client.get("/auth/me", headers={"Authorization": f"Bearer {access_token}"})
+
+
+def _sid(access_token):
+    return jwt.decode(access_token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])["sid"]
+
+
+def test_refresh_rotates_the_refresh_token(auth_client):
+    first = auth_client.tokens
+
+    response = _refresh(auth_client, first["refresh_token"])
+
+    assert response.status_code == 200, response.text
+    second = response.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert _me(auth_client, second["access_token"]).status_code == 200
+    # A sessão continua a mesma: o access token novo carrega o mesmo sid
+    assert _sid(second["access_token"]) == _sid(first["access_token"])
+
+
+def test_reusing_a_rotated_refresh_token_revokes_the_session(auth_client):
+    first = auth_client.tokens
+    second = _refresh(auth_client, first["refresh_token"]).json()
+
+    reuse = _refresh(auth_client, first["refresh_token"])
+
+    assert reuse.status_code == 401
+    # A família inteira cai: o refresh token mais novo e os access tokens da sessão
+    assert _refresh(auth_client, second["refresh_token"]).status_code == 401
+    assert _me(auth_client, second["access_token"]).status_code == 401
+
+
+def test_logout_revokes_access_and_refresh_tokens(auth_client):
+    tokens = auth_client.tokens
+
+    assert auth_client.post("/auth/logout").status_code == 200
+
+    assert _me(auth_client, tokens["access_token"]).status_code == 401
+    assert _refresh(auth_client, tokens["refresh_token"]).status_code == 401
+
+
+def test_stale_revocation_filter_is_synced_once_for_concurrent_requests(auth_client, monkeypatch):
+    # Lock novo: o do módulo fica preso ao event loop em que foi disputado
+    monkeypatch.setattr(auth, "_revocation_sync_lock", asyncio.Lock())
+    token = auth_client.tokens["access_token"]
+
+    class SlowSession:
+        """Simula uma sincronização lenta, para as requisições se sobreporem"""
+
+        async def run_sync(self, fn):
+            await asyncio.sleep(0.05)
+            with SessionLocal() as db:
+                return fn(db)
+
+    async def concurrent_requests():
+        auth.revocation_filter._synced_at = None  # desatualizado
+        before = auth.revocation_filter.syncs
+        await asyncio.gather(*(auth.get_token_claims(token, SlowSession()) for _ in range(10)))
+        return auth.revocation_filter.syncs - before
+
+    assert asyncio.run(concurrent_requests()) == 1
@@ -0,0 +1,47 @@
+def _item(name, category="Mercearia"):
+    return {"name": name, "category": category, "quantity": "1", "estimated_price": 1.0}
+
+
+def _suggest(client, prefix, field="name"):
+    response = client.get("/shopping-lists/autocomplete", params={"q": prefix, "field": field})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _cache_stats(client):
+    return client.get("/health").json()["caches"]["autocomplete"]
+
+
+def test_renaming_an_item_drops_the_old_name(auth_client):
+    response = auth_client.post("/shopping-lists/", json={"name": "Mercado", "items": [_item("Farinha")]})
+    list_id, item_id = response.json()["id"], response.json()["items"][0]["id"]
+    assert _suggest(auth_client, "far") == [{"value": "Farinha", "count": 1}]
+
+    auth_client.put(f"/shopping-lists/{list_id}/items/{item_id}", json={"name": "Farofa"})
+
+    assert _suggest(auth_client, "far") == [{"value": "Farofa", "count": 1}]
+
+
+def test_batch_category_change_drops_the_old_category(auth_client):
+    response = auth_client.post("/shopping-lists/", json={"name": "Mercado", "items": [_item("Arroz", "Grãos")]})
+    list_id, item_id = response.json()["id"], response.json()["items"][0]["id"]
+    assert _suggest(auth_client, "gr", "category") == [{"value": "Grãos", "count": 1}]
+
+    auth_client.post(f"/shopping-lists/{list_id}/items/batch", json={
+        "update": [{"id": item_id, "category": "Cereais"}],
+    })
+
+    assert _suggest(auth_client, "gr", "category") == []
+    assert _suggest(auth_client, "ce", "category") == [{"value": "Cereais", "count": 1}]
+
+
+def test_writes_do_not_count_as_cache_hits_or_misses(auth_client):
+    list_id = auth_client.post("/shopping-lists/", json={"name": "Mercado"}).json()["id"]
+    _suggest(auth_client, "a")
+    before = _cache_stats(auth_client)
+
+    auth_client.post(f"/shopping-lists/{list_id}/items", json=_item("Azeite"))
+
+    after = _cache_stats(auth_client)
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
+    assert _suggest(auth_client, "az") == [{"value": "Azeite", "count": 1}]
@@ -0,0 +1,23 @@
+from datetime import date
+
+from app.routers import dashboard
+
+
+class FixedDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2026, 10, 15)
+
+
+def test_month_to_date_ignores_transactions_scheduled_after_today(auth_client, monkeypatch):
+    monkeypatch.setattr(dashboard, "date", FixedDate)
+    for day, amount, type in [(10, 100.0, "income"), (12, 40.0, "expense"), (20, 30.0, "expense"), (31, 5.0, "income")]:
+        response = auth_client.post("/transactions/", json={
+            "description": "x", "category": "Outros", "date": f"2026-10-{day:02d}", "amount": amount, "type": type,
+        })
+        assert response.status_code == 201, response.text
+
+    response = auth_client.get("/dashboard/")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["month_to_date"] == {"month": "2026-10", "income": 100.0, "expense": 40.0, "net": 60.0}
@@ -0,0 +1,99 @@
+import io
+from datetime import date
+
+import pytest
+
+from app import models
+from app.imports import ImportFormat, StatementParseError, iter_statement_rows
+
+COLUMNS = {"date": "date", "description": "description", "amount": "amount", "category": "category"}
+
+CSV_STATEMENT = (
+    "﻿date;description;amount;category\n"
+    "02/01/2025;Café  Central;-1.234,50;\n"
+    "2025-01-02;cafe central;-1234.50;Lazer\n"
+    "2025-01-05;Salário;5000,00;Salário\n"
+).encode("utf-8")
+
+OFX_STATEMENT = (
+    "<OFX><BANKTRANLIST>\n"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250110120000<TRNAMT>-42.90<MEMO>Padaria São João</STMTTRN>\n"
+    "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250111<TRNAMT>100.00<NAME>Pix recebido</STMTTRN>\n"
+    "</BANKTRANLIST></OFX>\n"
+).encode("latin-1")
+
+
+class UploadStream:
+    """Como o SpooledTemporaryFile do Python 3.10: iterável, mas sem `readable`"""
+
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+
+    def __iter__(self):
+        return iter(self._buffer)
+
+    def read(self, *args):
+        return self._buffer.read(*args)
+
+    def readline(self, *args):
+        return self._buffer.readline(*args)
+
+
+def _rows(data: bytes, format: ImportFormat):
+    return list(iter_statement_rows(UploadStream(data), format, 1, None, "Outros", COLUMNS))
+
+
+def test_csv_rows_are_parsed_and_repeated_entries_get_distinct_hashes():
+    rows = _rows(CSV_STATEMENT, ImportFormat.csv)
+
+    assert [(row["date"], row["amount"], row["type"], row["category"]) for row in rows] == [
+        (date(2025, 1, 2), 1234.5, models.TransactionType.expense, "Outros"),
+        (date(2025, 1, 2), 1234.5, models.TransactionType.expense, "Lazer"),
+        (date(2025, 1, 5), 5000.0, models.TransactionType.income, "Salário"),
+    ]
+    # Mesmo dia, valor e descrição normalizada: a ocorrência diferencia os dois
+    assert rows[0]["import_hash"] != rows[1]["import_hash"]
+    # Reimportar o mesmo extrato gera os mesmos hashes
+    assert [row["import_hash"] for row in _rows(CSV_STATEMENT, ImportFormat.csv)] == [
+        row["import_hash"] for row in rows
+    ]
+
+
+def test_ofx_rows_are_parsed():
+    rows = _rows(OFX_STATEMENT, ImportFormat.ofx)
+
+    assert [(row["date"], row["amount"], row["description"]) for row in rows] == [
+        (date(2025, 1, 10), 42.9, "Padaria São João"),
+        (date(2025, 1, 11), 100.0, "Pix recebido"),
+    ]
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"date,description,amount\n2026-01-01,foo\n", "Line 2: missing 'amount'"),
+    # Campo acima do csv.field_size_limit(): erro do próprio módulo csv
+    (b"date,description,amount\n2026-01-01,foo,1.00\n2026-01-02,\"" + b"x" * 200_000 + b"\",2.00\n", "Line 3:"),
+    (b"description,amount\nfoo,1.00\n", "Missing column 'date'"),
+], ids=["truncated-row", "csv-error", "missing-column"])
+def test_malformed_csv_raises_statement_parse_error(data, message):
+    with pytest.raises(StatementParseError, match=message):
+        _rows(data, ImportFormat.csv)
+
+
+def test_import_endpoint_rejects_truncated_rows(auth_client):
+    files = {"file": ("extrato.csv", b"date,description,amount\n2026-01-01,foo\n", "text/csv")}
+
+    response = auth_client.post("/transactions/import", files=files)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Line 2: missing 'amount'"
+
+
+def test_import_endpoint_skips_already_imported_rows(auth_client):
+    files = {"file": ("extrato.csv", CSV_STATEMENT, "text/csv")}
+
+    first = auth_client.post("/transactions/import", files=files)
+    second = auth_client.post("/transactions/import", files=files)
+
+    assert first.status_code == 200, first.text
+    assert first.json() == {"imported": 3, "duplicates": 0}
+    assert second.json() == {"imported": 0, "duplicates": 3}
@@ -0,0 +1,87 @@
+def _create_item(client, **fields):
+    list_id = client.post("/shopping-lists/", json={"name": "Mercado"}).json()["id"]
+    item = dict({"name": "Café", "category": "Mercearia", "quantity": "1", "estimated_price": 20.0}, **fields)
+    response = client.post(f"/shopping-lists/{list_id}/items", json=item)
+    assert response.status_code == 201, response.text
+    return list_id, response.json()["id"]
+
+
+def _estimate(client, name="cafe"):
+    return client.get("/shopping-lists/prices/estimate", params={"name": name}).json()
+
+
+def test_unticking_and_ticking_again_counts_the_item_once(auth_client):
+    list_id, item_id = _create_item(auth_client)
+    url = f"/shopping-lists/{list_id}/items/{item_id}"
+
+    auth_client.put(url, json={"is_purchased": True, "actual_price": 18.0})
+    auth_client.put(url, json={"is_purchased": False})
+    auth_client.put(url, json={"is_purchased": True})
+
+    estimate = _estimate(auth_client)
+    assert estimate["count"] == 1
+    assert estimate["mean_price"] == 18.0
+
+
+def test_correcting_the_price_of_a_purchased_item_replaces_the_observation(auth_client):
+    _create_item(auth_client, is_purchased=True, actual_price=25.0)
+    list_id, item_id = _create_item(auth_client, is_purchased=True, actual_price=180.0)
+
+    auth_client.put(f"/shopping-lists/{list_id}/items/{item_id}", json={"actual_price": 18.0})
+
+    estimate = _estimate(auth_client)
+    assert estimate["count"] == 2
+    assert estimate["last_price"] == 18.0
+    assert estimate["mean_price"] == 21.5
+
+
+def test_batch_corrections_and_reticks_follow_the_same_rules(auth_client):
+    list_id, item_id = _create_item(auth_client)
+    url = f"/shopping-lists/{list_id}/items/batch"
+
+    auth_client.post(url, json={"update": [{"id": item_id, "is_purchased": True, "actual_price": 30.0}]})
+    auth_client.post(url, json={"update": [
+        {"id": item_id, "is_purchased": False},
+        {"id": item_id, "is_purchased": True, "actual_price": 24.0},
+    ]})
+
+    estimate = _estimate(auth_client)
+    assert estimate["count"] == 1
+    assert estimate["last_price"] == 24.0
+    assert estimate["mean_price"] == 24.0
+
+
+def test_renamed_purchased_item_starts_a_new_observation(auth_client):
+    list_id, item_id = _create_item(auth_client, is_purchased=True, actual_price=20.0)
+
+    auth_client.put(f"/shopping-lists/{list_id}/items/{item_id}", json={"name": "Chá", "actual_price": 9.0})
+
+    assert _estimate(auth_client)["count"] == 1
+    assert _estimate(auth_client, "cha")["last_price"] == 9.0
+
+
+def test_unpurchasing_keeps_the_estimate_valid(auth_client):
+    list_id, item_id = _create_item(auth_client, is_purchased=True, actual_price=18.0)
+
+    auth_client.put(f"/shopping-lists/{list_id}/items/{item_id}", json={"is_purchased": False})
+    response = auth_client.get("/shopping-lists/prices/estimate", params={"name": "cafe"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["count"] == 1
+
+
+def test_correction_without_history_has_no_estimate(auth_client):
+    from app.database import SessionLocal
+    from app.prices import PriceHistoryDeltas
+
+    # Correção de um item cuja observação não está no histórico: linha com contagem 0
+    prices = PriceHistoryDeltas()
+    prices.correct("Café", 20.0, 18.0)
+    with SessionLocal() as db:
+        prices.apply(db, 1)
+        db.commit()
+
+    assert _estimate(auth_client) == {
+        "name": "cafe", "estimated_price": None, "last_price": None, "mean_price": None,
+        "min_price": None, "max_price": None, "count": 0, "updated_at": None,
+    }
@@ -0,0 +1,34 @@
+def _create_list(client, count):
+    response = client.post("/shopping-lists/", json={"name": "Mercado", "items": [
+        {"name": f"Item {i}", "category": "Mercearia", "quantity": "1", "estimated_price": 10.0, "order": i}
+        for i in range(count)
+    ]})
+    assert response.status_code == 201, response.text
+    shopping_list = response.json()
+    return shopping_list["id"], [item["id"] for item in shopping_list["items"]]
+
+
+def test_batch_update_with_different_fields_per_item_fits_the_query_budget(auth_client):
+    list_id, ids = _create_list(auth_client, 6)
+
+    response = auth_client.post(f"/shopping-lists/{list_id}/items/batch", json={"update": [
+        {"id": ids[0], "is_purchased": True, "actual_price": 12.0},
+        {"id": ids[1], "order": 99},
+        {"id": ids[2], "name": "Arroz", "category": "Grãos"},
+        {"id": ids[3], "notes": "integral"},
+        {"id": ids[4], "quantity": "2kg", "estimated_price": 20.0},
+        # Edições repetidas do mesmo item valem na ordem do lote
+        {"id": ids[5], "name": "Feijão"},
+        {"id": ids[5], "is_purchased": True},
+    ]})
+
+    assert response.status_code == 200, response.text
+    items = {item["id"]: item for item in response.json()["items"]}
+    assert items[ids[0]]["is_purchased"] and items[ids[0]]["actual_price"] == 12.0
+    assert items[ids[0]]["name"] == "Item 0"
+    assert items[ids[1]]["order"] == 99
+    assert (items[ids[2]]["name"], items[ids[2]]["category"]) == ("Arroz", "Grãos")
+    assert items[ids[3]]["notes"] == "integral"
+    assert (items[ids[4]]["quantity"], items[ids[4]]["estimated_price"]) == ("2kg", 20.0)
+    assert items[ids[5]]["name"] == "Feijão" and items[ids[5]]["is_purchased"]
+    assert response.json()["total_estimated"] == 70.0
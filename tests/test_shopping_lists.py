@@ -0,0 +1,106 @@
+def _item(name, **fields):
+    return dict({"name": name, "category": "Mercearia", "quantity": "1", "estimated_price": 10.0}, **fields)
+
+
+def _create_list(client, items, name="Mercado"):
+    response = client.post("/shopping-lists/", json={"name": name, "month": "2026-10", "items": items})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_create_list_with_mixed_items_fits_the_query_budget(auth_client):
+    # Comprados e não comprados intercalados: colunas nulas diferentes a cada linha
+    items = [
+        _item(f"Item {i}", order=i, notes="marca X" if i % 3 else None,
+              is_purchased=i % 2 == 0, actual_price=12.0 if i % 2 == 0 else None)
+        for i in range(12)
+    ]
+
+    shopping_list = _create_list(auth_client, items)
+
+    assert [item["name"] for item in shopping_list["items"]] == [f"Item {i}" for i in range(12)]
+    assert shopping_list["total_estimated"] == 120.0
+    assert shopping_list["total_spent"] == 72.0
+
+
+def test_update_list_and_complete_with_transactions_fit_the_query_budget(auth_client):
+    account = auth_client.post("/accounts/", json={"name": "Conta", "bank": "Banco", "balance": 100.0}).json()
+    shopping_list = _create_list(auth_client, [
+        _item("Arroz", is_purchased=True, actual_price=20.0),
+        _item("Sabão", category="Limpeza", is_purchased=True, actual_price=5.0),
+        _item("Feijão"),
+    ])
+    list_id = shopping_list["id"]
+
+    renamed = auth_client.put(f"/shopping-lists/{list_id}", json={"name": "Mercado do mês"})
+    assert renamed.status_code == 200, renamed.text
+    assert renamed.json()["name"] == "Mercado do mês"
+
+    completed = auth_client.put(
+        f"/shopping-lists/{list_id}?create_transactions=true&account_id={account['id']}",
+        json={"status": "completed"}
+    )
+    assert completed.status_code == 200, completed.text
+    assert completed.json()["status"] == "completed"
+    assert auth_client.get(f"/accounts/{account['id']}").json()["balance"] == 75.0
+
+
+def test_item_routes_fit_the_query_budget(auth_client):
+    list_id = _create_list(auth_client, [_item("Arroz")])["id"]
+
+    created = auth_client.post(f"/shopping-lists/{list_id}/items", json=_item("Café", is_purchased=True, actual_price=18.0))
+    assert created.status_code == 201, created.text
+    item_id = created.json()["id"]
+
+    updated = auth_client.put(f"/shopping-lists/{list_id}/items/{item_id}", json={"actual_price": 16.0})
+    assert updated.status_code == 200, updated.text
+    assert updated.json()["actual_price"] == 16.0
+
+    deleted = auth_client.delete(f"/shopping-lists/{list_id}/items/{item_id}")
+    assert deleted.status_code == 204, deleted.text
+    assert auth_client.get(f"/shopping-lists/{list_id}").json()["total_spent"] == 0.0
+
+
+def test_delete_list_with_items_fits_the_query_budget(auth_client):
+    list_id = _create_list(auth_client, [_item(f"Item {i}") for i in range(8)])["id"]
+
+    response = auth_client.delete(f"/shopping-lists/{list_id}")
+
+    assert response.status_code == 204, response.text
+    assert auth_client.get(f"/shopping-lists/{list_id}").status_code == 404
+
+
+def test_bulk_duplicate_fits_the_query_budget_for_any_number_of_copies(auth_client):
+    weekly = _create_list(auth_client, [_item("Pão", estimated_price=8.0), _item("Leite", estimated_price=6.0)], "Semana")
+    cleaning = _create_list(auth_client, [_item("Sabão", category="Limpeza", estimated_price=8.0)], "Limpeza")
+
+    # A mesma origem pode aparecer várias vezes, inclusive com o mesmo nome novo
+    copies = [
+        {"list_id": weekly["id"], "new_name": "Semana 1", "new_month": "2026-11"},
+        {"list_id": cleaning["id"], "new_name": "Limpeza", "new_month": "2026-11"},
+        {"list_id": weekly["id"], "new_name": "Semana 2", "new_month": "2026-11"},
+        {"list_id": weekly["id"], "new_name": "Semana 2", "new_month": "2026-11"},
+        {"list_id": cleaning["id"], "new_name": "Semana 2", "new_month": "2026-11"},
+    ]
+    response = auth_client.post("/shopping-lists/duplicate", json=copies)
+
+    assert response.status_code == 201, response.text
+    duplicated = response.json()
+    assert [copy["name"] for copy in duplicated] == [copy["new_name"] for copy in copies]
+    assert len({copy["id"] for copy in duplicated}) == len(copies)
+    assert [[item["name"] for item in copy["items"]] for copy in duplicated] == [
+        ["Pão", "Leite"], ["Sabão"], ["Pão", "Leite"], ["Pão", "Leite"], ["Sabão"],
+    ]
+    assert [copy["total_estimated"] for copy in duplicated] == [14.0, 8.0, 14.0, 14.0, 8.0]
+
+
+def test_bulk_duplicate_of_a_missing_list_creates_nothing(auth_client):
+    source = _create_list(auth_client, [_item("Pão")])
+
+    response = auth_client.post("/shopping-lists/duplicate", json=[
+        {"list_id": source["id"], "new_name": "Cópia"},
+        {"list_id": 999, "new_name": "Cópia"},
+    ])
+
+    assert response.status_code == 404, response.text
+    assert len(auth_client.get("/shopping-lists/").json()) == 1